@@ -7,21 +7,91 @@ Used for updating:
 """
 
 import os
+import asyncio
 import datetime
 import pickle
+import shelve
 import json
 import time
 import requests
+import aiohttp
 import traceback
 import pandas as pd
 import numpy as np
-import shutil
-from io import StringIO
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+import pyarrow.compute as pc
+from pandas.api.types import union_categoricals
+from functools import cached_property, wraps
+from concurrent.futures import ThreadPoolExecutor
 import air_quality.constants as C
 import air_quality.logging as aqlogging
 from meteostat import Stations
 from meteostat import Hourly
 
+_ONE_DAY = datetime.timedelta(days = 1)
+_ONE_HOUR = datetime.timedelta(hours = 1)
+
+
+def _with_copy_on_write(method):
+    """Runs a method with pandas copy-on-write enabled.
+
+    With copy-on-write, frames derived from the cached existing data only copy the
+    blocks they modify, so we don't need defensive copies of the whole dataframe. The
+    option is only set for the duration of the call so that pandas behaviour elsewhere
+    in the process is unchanged.
+    """
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with pd.option_context('mode.copy_on_write', True):
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+class _RateLimiter:
+    """Spaces out calls to each API by at least a minimum interval.
+
+    Only waits for whatever remains of the interval since the last call to the same API,
+    so time already spent processing counts towards it.
+
+    Attributes:
+        min_interval: Float of minimum number of seconds between calls to the same API.
+        last_calls: Dictionary with strings of API names as keys and the monotonic time
+            of the last call to each as values.
+    """
+
+    def __init__(self, min_interval : float = 1.0):
+        self.min_interval = min_interval
+        self.last_calls = {}
+
+
+    def wait(self, api_name : str):
+        """Waits if needed before a call to the given API, then records the call."""
+
+        since_last_call = time.monotonic() - self.last_calls.get(api_name, -self.min_interval)
+        if since_last_call < self.min_interval:
+            time.sleep(self.min_interval - since_last_call)
+
+        self.last_calls[api_name] = time.monotonic()
+
+
+    async def wait_async(self, api_name : str):
+        """Equivalent of wait for use in a coroutine, so the event loop isn't blocked."""
+
+        since_last_call = time.monotonic() - self.last_calls.get(api_name, -self.min_interval)
+        if since_last_call < self.min_interval:
+            await asyncio.sleep(self.min_interval - since_last_call)
+
+        self.last_calls[api_name] = time.monotonic()
+
+
+# Shared by all data managers so that calls to an API are spaced out across the process.
+_rate_limiter = _RateLimiter()
+
 
 class DataUpdater:
     """For executing the updates of various stored data.
@@ -31,6 +101,8 @@ class DataUpdater:
         CACHE_DIR_PATH: String of path to cache folder.
         KEY_TIMES_PATH: String of path to 'key-times.pkl' file in cache folder.
         TZ: String of timezone.
+        session: A requests Session shared by the calls to the site, so that the
+            connection is reused.
     """
 
     LOG_DIR_PATH = os.path.join(C.WORK_DIR, 'logs')
@@ -40,6 +112,9 @@ class DataUpdater:
 
     TZ = 'Europe/Paris'
 
+    def __init__(self):
+        self.session = requests.Session()
+
     def _init_cache(self):
         if not os.path.exists(self.CACHE_DIR_PATH):
             os.makedirs(self.CACHE_DIR_PATH)
@@ -76,42 +151,6 @@ class DataUpdater:
             return pickle.load(file)
 
 
-    def _create_temp_data(self):
-        """Copies existing data into a temporary folder so we can update it
-        without affecting the live use of the data. (Once update is complete
-        the updated temp data overwrites the existing data.)
-        """
-
-        self._clear_temp_data()
-
-        dm = DataManager()
-        src_path = dm.EXISTING_DATA_PATH
-        dest_path = os.path.join(src_path, 'temp')
-
-        shutil.copytree(src_path, dest_path)
-
-
-    def _copy_temp_data_to_live(self):
-        """Copies updated data to live."""
-
-        dm = DataManager()
-        dest_path = dm.EXISTING_DATA_PATH
-        src_path = os.path.join(dest_path, 'temp')
-        files=os.listdir(src_path)
-        for fname in files:
-            filepath = os.path.join(src_path, fname)
-            if not os.path.isdir(filepath):
-                shutil.copy2(os.path.join(src_path, fname), dest_path)
-
-
-    def _clear_temp_data(self):
-        dm = DataManager()
-        src_path = dm.EXISTING_DATA_PATH
-        dest_path = os.path.join(src_path, 'temp')
-        if os.path.exists(dest_path):
-            shutil.rmtree(dest_path)
-
-
     def hit_home_page(self):
         """Send a GET request to the home page.
 
@@ -123,7 +162,7 @@ class DataUpdater:
 
         home_url = C.ENV_VARS['HOME_URL']
         print(home_url)
-        response = requests.request("GET", home_url)
+        response = self.session.get(home_url)
         return response.status_code
 
     def clear_image_cache(self):
@@ -138,7 +177,7 @@ class DataUpdater:
             'key' : C.ENV_VARS['CACHE_CLEAR_KEY']
         }
         print(url)
-        response = requests.request("GET", url, params = query_string)
+        response = self.session.get(url, params = query_string)
         return response.status_code, response.text
 
 
@@ -153,9 +192,6 @@ class DataUpdater:
 
         try:
 
-            # Copy existing data files to temp folder for update
-            self._create_temp_data()
-
             weather_forecast_dm = WeatherForecastDataManager()
             weather_forecast_dm.update_current_data()
 
@@ -165,10 +201,6 @@ class DataUpdater:
             air_quality_dm = AirQualityDataManager()
             air_quality_dm.update_to_yesterday()
 
-            self._copy_temp_data_to_live()
-
-            self._clear_temp_data()
-
         except Exception as e:
 
             tb_str = "".join(traceback.format_tb(e.__traceback__))
@@ -196,7 +228,7 @@ class DataUpdater:
             'key' : C.ENV_VARS['CACHE_CLEAR_KEY']
         }
         print(url)
-        response = requests.request("GET", url, params = query_string)
+        response = self.session.get(url, params = query_string)
         return response.status_code, response.text
 
 class DataManager:
@@ -206,18 +238,18 @@ class DataManager:
         PREDICTION_EARLIEST_START: String of earliest date possible for forecast in the
             format yyyy-mm-dd.
         EXISTING_DATA_PATH: Path to the directory containing the existing data.
-        EXISTING_DATA_FILENAME: Name of the file containing the existing data. Set by
-            subclass.
+        EXISTING_DATA_FILENAME: Name of the file containing the existing data, without the
+            '.parquet' extension. Set by subclass.
         BASE_BACKUPS_PATH: String of path to the directory where all backups of downloaded
             data are stored.
         LOCATIONS_COORDS: Dictionary containing GPS coordinates for Montpellier and Marseille.
         WEATHER_VARS: List of the variable to be retrieved by API.
         TZ: String of timezone.
         logger: A logger instance from the Python logging module. Set by subclass.
-        existing_data: A Pandas dataframe containing the existing data.
-        temp_existing_data: A Pandas dataframe containing the temporary existing data. This
-            is a copy of the existing data that is updated with new data before overwriting
-            the stored existing data.
+        existing_data: A Pandas dataframe containing the existing data. Read from disk on
+            first access and replaced when saved.
+        existing_data_last_time: Pandas timestamp of the last time in the existing data.
+            Calculated on first access and updated when the existing data is saved.
     """
 
     PREDICTION_EARLIEST_START = '2014-01-01'
@@ -252,10 +284,6 @@ class DataManager:
         # Each subclass will create its own logger.
         self.logger = None
 
-        self.existing_data = None
-
-        self.temp_existing_data = None
-
 
     def _handle_error(self, e : Exception, message : str = ''):
         """Used in the Except clause of a try - except pattern to log error messages."""
@@ -273,113 +301,168 @@ class DataManager:
             raise Exception(e)
 
 
-    def get_existing_data_df(self, temp = False):
-        """Gets the existing stored data, either the live version or the temporary.
+    def _get_existing_data_path(self):
+        """Gets the path of the existing data file, without extension."""
+
+        return os.path.join(self.EXISTING_DATA_PATH, self.EXISTING_DATA_FILENAME)
+
+
+    def _write_parquet(self, df : pd.DataFrame, parquet_path : str):
+        """Writes a dataframe as Parquet, replacing any existing file atomically.
+
+        The data is written to a temporary file first and then renamed, so anything
+        reading the file never sees a partially written version.
 
         Args:
-            temp: Boolean of whether to return the temporary existing data.
+            df: Pandas dataframe to be written.
+            parquet_path: String of path to the Parquet file.
+        """
+
+        tmp_path = f"{parquet_path}.tmp"
+        df.to_parquet(tmp_path, engine = 'pyarrow', compression = 'zstd')
+        os.replace(tmp_path, parquet_path)
+
+
+    def _read_existing_data(self, path : str):
+        """Reads the existing data stored as Parquet.
+
+        If only the legacy pickle file exists, it is converted to Parquet first. The legacy
+        file is left in place.
+
+        Args:
+            path: String of path to the existing data file, without extension.
 
         Returns:
-            A Pandas dataframe of the existing data (live or temporary).
+            A Pandas dataframe of the existing data.
         """
 
-        if temp:
+        parquet_path = f"{path}.parquet"
 
-            if self.temp_existing_data is None:
-                path = os.path.join(self.EXISTING_DATA_PATH, 'temp', self.EXISTING_DATA_FILENAME)
-                with open(f"{path}.pkl", 'rb') as file:
-                    self.temp_existing_data = pickle.load(file)
+        if not os.path.exists(parquet_path):
+            with open(f"{path}.pkl", 'rb') as file:
+                legacy_data = pickle.load(file)
+            self._write_parquet(legacy_data, parquet_path)
 
-            return self.temp_existing_data.copy()
+        data = pd.read_parquet(parquet_path, engine = 'pyarrow')
+
+        # The first column is a category for the data - either 'location' or 'Polluant'.
+        # Parquet keeps categoricals, so this only converts data saved before they were used.
+        category_col_name = data.columns[0]
+        data[category_col_name] = data[category_col_name].astype('category')
+
+        return data
 
-        else:
 
-            if self.existing_data is None:
-                path = os.path.join(self.EXISTING_DATA_PATH, self.EXISTING_DATA_FILENAME)
-                with open(f"{path}.pkl", 'rb') as file:
-                    self.existing_data = pickle.load(file)
+    @cached_property
+    def existing_data(self):
+        return self._read_existing_data(self._get_existing_data_path())
 
-            return self.existing_data.copy()
 
+    def get_existing_data_df(self):
+        """Gets the existing stored data.
 
-    def save_existing_data_df(self, df, temp = False):
+        Returns:
+            A Pandas dataframe of the existing data. This is the cached dataframe itself
+            rather than a copy.
+        """
+
+        return self.existing_data
+
+
+    def save_existing_data_df(self, df):
         """Saves data as existing data.
 
         Args:
             df: Pandas dataframe to be saved.
-            temp: Boolean of whether to save as temporary existing data instead of live.
         """
 
-        if temp:
-
-            self.temp_existing_data = df.copy()
-            path = os.path.join(self.EXISTING_DATA_PATH, 'temp', f"{self.EXISTING_DATA_FILENAME}.pkl")
-            with open(path, 'wb') as file:
-                pickle.dump(df, file)
+        self.existing_data = df
+        self.existing_data_last_time = df['Datetime'].max()
+        self._write_parquet(df, f"{self._get_existing_data_path()}.parquet")
 
-        else:
-
-            self.existing_data = df.copy()
-            path = os.path.join(self.EXISTING_DATA_PATH, f"{self.EXISTING_DATA_FILENAME}.pkl")
-            with open(path, 'wb') as file:
-                pickle.dump(df, file)
 
+    @cached_property
+    def existing_data_last_time(self):
+        return self.get_existing_data_df()['Datetime'].max()
 
-    def get_existing_data_last_time(self, temp = False):
-        """Gets tbe last timestamp of the existing data (live or temporary).
 
-        Args:
-            temp: Boolean of whether to use the temporary existing data instead of live.
+    def get_existing_data_last_time(self):
+        """Gets tbe last timestamp of the existing data.
 
         Returns:
             Pandas timestamp.
         """
 
-        existing_data_df = self.get_existing_data_df(temp)
-        return existing_data_df['Datetime'].max()
+        return self.existing_data_last_time
 
 
-    def get_next_day_to_fetch(self, temp = False):
+    def get_next_day_to_fetch(self):
         """Gets the date of the next that should be fetched to update existing data.
 
         In effect the date returned is the date of the day following the last day of
         the existing data.
 
-        Args:
-            temp: Boolean of whether to use the temporary existing data instead of live.
-
         Returns:
             datetime.date object.
         """
 
-        existing_data_last_time = self.get_existing_data_last_time(temp).date()
-        return existing_data_last_time + pd.Timedelta(1, 'day')
+        existing_data_last_time = self.get_existing_data_last_time().date()
+        return existing_data_last_time + _ONE_DAY
 
 
-    def _previous_days_data_exists(self, date : str, temp : bool = False):
-        existing_data_last_time = self.get_existing_data_last_time(temp)
-        previous_day_last_datetime = pd.to_datetime(f"{date} 23:00:00") - pd.Timedelta(1, 'day')
+    def _previous_days_data_exists(self, date : str):
+        existing_data_last_time = self.get_existing_data_last_time()
+        previous_day = datetime.date.fromisoformat(date) - _ONE_DAY
+        previous_day_last_datetime = datetime.datetime.combine(previous_day, datetime.time(23))
         return previous_day_last_datetime <= existing_data_last_time
 
 
-    def _get_api_response(self, api_url : str, query_params : dict, headers : dict = None):
-        return requests.request("GET", api_url, params = query_params, headers = headers)
+    def _today(self):
+        return pd.Timestamp.today(self.TZ).date()
 
 
-    def _get_api_json_reponse(self, api_url : str, query_params : dict, headers : dict = None):
-        response = self._get_api_response(api_url, query_params, headers)
-        return json.loads(response.text)
+    def _concat_data(self, dfs : list, **kwargs):
+        """Concatenates dataframes, keeping categorical columns categorical.
 
+        Pandas only keeps a categorical column when its categories are the same in every
+        dataframe, so the categories are unified first. Any other keyword arguments are
+        passed to pd.concat.
 
-    def _today(self):
-        return pd.Timestamp.today(self.TZ).date()
+        Args:
+            dfs: List of Pandas dataframes.
+
+        Returns:
+            Pandas dataframe.
+        """
+
+        categorical_col_names = {
+            col_name for df in dfs for col_name, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        }
+
+        for col_name in categorical_col_names:
+
+            categories = union_categoricals(
+                [df[col_name].astype('category') for df in dfs]
+            ).categories
+            dtype = pd.CategoricalDtype(categories.sort_values())
+
+            unified_dfs = []
+            for df in dfs:
+                if df[col_name].dtype != dtype:
+                    df = df.copy(deep = False)
+                    df[col_name] = df[col_name].astype(dtype)
+                unified_dfs.append(df)
+            dfs = unified_dfs
+
+        return pd.concat(dfs, copy = False, **kwargs)
 
 
     def _fill_missing_values(self, dataframe : pd.DataFrame):
         """"Fills NaN values using linear interpolation followed by forward fill."""
 
         # The first column is a category for the data - either 'location' or 'Polluant'.
-        # So we divide our dataframe up by the category column before interpolating.
+        # So we interpolate within each category rather than across the whole dataframe.
         category_col_name = dataframe.columns[0]
 
         df = dataframe.pivot_table(
@@ -387,29 +470,17 @@ class DataManager:
             dropna = False
         )
 
-        category_dfs = []
-        for category in df.index.get_level_values(0).unique():
-
-            category_df = df.loc[category]
-
-            if category_df.isna().values.any():
-
-                # First use linear interpolation where possible.
-                category_df.interpolate(inplace = True)
-
-                # Then pad to fill any null values at the end if there are any.
-                if category_df.isna().values.any():
-                    category_df.interpolate(method = 'pad', inplace = True)
-
-            # Add in the category column again and reset to original order.
-            category_df.reset_index(inplace = True)
-            category_df.insert(0, category_col_name, category)
+        if df.isna().values.any():
 
+            # First use linear interpolation where possible, then pad to fill any
+            # null values at the end.
+            df = df.groupby(level = 0, group_keys = False, sort = False).apply(
+                lambda category_df: category_df.interpolate().ffill()
+            )
 
-            category_dfs.append(category_df)
-
-        # Recombine all the categories dataframes together into a single df.
-        filled_df = pd.concat(category_dfs).reset_index(drop = True)
+        # Restore the category column as the first column.
+        filled_df = df.reset_index()
+        filled_df[category_col_name] = filled_df[category_col_name].astype('category')
         filled_df['Datetime'] = pd.to_datetime(filled_df['Datetime'])
 
         return filled_df
@@ -448,23 +519,18 @@ class WeatherForecastDataManager(DataManager):
     def __init__(self):
         super().__init__()
 
-        self.existing_data = None
-
         self.logger = aqlogging.setup_logger(
             name = 'Weather forecast data update', log_filepath = self.LOGS_PATH)
 
 
-    def get_last_date_current_data(self, temp = False):
-        """Gets the last date of the stored existing data (live or temporary).
-
-        Args:
-            temp: Boolean of whether to use the temporary existing data instead of live.
+    def get_last_date_current_data(self):
+        """Gets the last date of the stored existing data.
 
         Returns:
             datatime.date object.
         """
 
-        current_data = self.get_existing_data_df(temp)
+        current_data = self.get_existing_data_df()
 
         last_dates = []
         for location in self.LOCATIONS:
@@ -475,31 +541,60 @@ class WeatherForecastDataManager(DataManager):
         return min(last_dates).date()
 
 
+    async def _fetch_location_data(
+        self,
+        session : aiohttp.ClientSession,
+        api_url : str,
+        query_params : dict,
+        location : str,
+        coordinates : tuple
+    ):
+
+        location_query_params = {
+            **query_params,
+            'latitude' : str(coordinates[0]),
+            'longitude' : str(coordinates[1])
+        }
+
+        async with session.get(api_url, params = location_query_params) as response:
+            json_data = await response.json()
+
+        return location, json_data
+
+
+    async def _fetch_locations_data(self, api_url : str, query_params : dict):
+
+        # Request all locations concurrently rather than one after the other.
+        async with aiohttp.ClientSession() as session:
+            return await asyncio.gather(*[
+                self._fetch_location_data(session, api_url, query_params, location, coordinates)
+                for location, coordinates in self.LOCATIONS_COORDS.items()
+            ])
+
+
     def _fetch_data(self, start : str, end : str):
 
         # We add the hourly weather variables because for some reason it does
-        # not work as a param in requests.request.
+        # not work as a query param.
         api_url = self.API_URL + '?hourly=' + ','.join(self.WEATHER_VARS)
 
         query_params = {
             'timezone' : self.TZ,
-            'start_date' : start,
-            'end_date' : end,
+            'start_date' : str(start),
+            'end_date' : str(end),
         }
 
-        forecast_hourly_data_dfs = []
-
-        for location, coordinates in self.LOCATIONS_COORDS.items():
-            query_params['latitude'] = str(coordinates[0])
-            query_params['longitude'] = str(coordinates[1])
+        locations_data = asyncio.run(self._fetch_locations_data(api_url, query_params))
 
-            json_data = self._get_api_json_reponse(api_url, query_params)
+        forecast_hourly_data_dfs = []
 
+        for location, json_data in locations_data:
             forecast_hourly_data_df = pd.DataFrame(json_data['hourly'])
             forecast_hourly_data_df['location'] = location
             forecast_hourly_data_dfs.append(forecast_hourly_data_df)
 
         forecast_hourly_data = pd.concat(forecast_hourly_data_dfs)
+        forecast_hourly_data['location'] = forecast_hourly_data['location'].astype('category')
 
         # Rename columns to match the column names of the bulk historical
         # forecast data.
@@ -526,7 +621,7 @@ class WeatherForecastDataManager(DataManager):
     ):
 
         merged_data = (
-            pd.concat([current_data, fetched_data])
+            self._concat_data([current_data, fetched_data], ignore_index = True)
 
             # We will have duplicates as we are updating old forecasts.
             # Since we have added the new fetched_data to the end, we ensure
@@ -536,15 +631,17 @@ class WeatherForecastDataManager(DataManager):
                 keep = 'last'
             )
 
-            .sort_values(by = ['location', 'Datetime'], ascending = [False, True])
-
-            .reset_index(drop = True)
+            .sort_values(
+                by = ['location', 'Datetime'],
+                ascending = [False, True],
+                ignore_index = True
+            )
         )
 
         # Fill any null values.
         filled_data = self._fill_missing_values(merged_data)
 
-        self.save_existing_data_df(filled_data, temp = True)
+        self.save_existing_data_df(filled_data)
 
 
     def _backup_fetched_data(self,
@@ -564,6 +661,7 @@ class WeatherForecastDataManager(DataManager):
         fetched_data.to_csv(os.path.join(dirpath, filename))
 
 
+    @_with_copy_on_write
     def update_current_data(self):
         """Fetches new data, cleans, adds to existing data and saves.
 
@@ -571,9 +669,9 @@ class WeatherForecastDataManager(DataManager):
             Boolean of whether update has been attempted.
         """
 
-        current_data = self.get_existing_data_df(temp = True)
+        current_data = self.get_existing_data_df()
 
-        last_date_current_data = self.get_last_date_current_data(temp = True)
+        last_date_current_data = self.get_last_date_current_data()
 
         # If the last data we have is on the 13th, say, then the last
         # forecast ran from the 7th to the 13th. So we will fetch from
@@ -613,7 +711,8 @@ class AirQualityDataManager(DataManager):
 
     Attributes:
         EXISTING_DATA_FILENAME: String of filename of the current weather forecast data.
-        BACKUPS_PATH: String of path to the folder where downloaded data is stored
+        BACKUPS_PATH: String of path to the folder where downloaded data is stored, as a
+            Parquet dataset partitioned by date and then pollutant.
         LOGS_PATH: String of path to the log file.
         REQUEST_API_URL: String of API url for requesting creation of a download file.
         DOWNLOAD_API_URL: String of API url for downloading data when created.
@@ -623,6 +722,15 @@ class AirQualityDataManager(DataManager):
         STATION_LOCATIONS: Dictionary with strings of pollutants as keys, and their values
             being a list of the locations where data for the given pollutant is recorded. Used
             in the request API.
+        STATION_NAME_CORRECTIONS: Dictionary mapping known misspellings of station names in
+            the downloaded data to the correct names.
+        DATA_COLUMNS: List of the columns of the downloaded data that are used.
+        MAX_CONCURRENT_REQUESTS: Integer of the maximum number of requests made to Geod'Air
+            at the same time.
+        DOWNLOAD_IDS_CACHE_PATH: String of path to the shelf caching the download ids
+            returned by Geod'Air, so that a retried update does not request them again.
+        DOWNLOAD_IDS_CACHE_TTL: Integer of the number of seconds a cached download id is
+            used for.
         api_key: String of key to use in API request.
         logger: A logger instance from the Python logging module. Set by subclass.
         existing_data: A Pandas dataframe containing the existing data.
@@ -658,19 +766,74 @@ class AirQualityDataManager(DataManager):
         'SO2' : ["MARSEILLE 5 AVENUES"]
     }
 
+    STATION_NAME_CORRECTIONS = {
+        'Chaptal' : 'Montpellier Chaptal',
+        'Saint Denis' : 'Montpellier St Denis'
+    }
+
+    DATA_COLUMNS = ['Date de début', 'Polluant', 'nom site', 'valeur brute']
+
+    MAX_CONCURRENT_REQUESTS = 2
+
+    DOWNLOAD_IDS_CACHE_PATH = os.path.join(C.WORK_DIR, 'cache', 'geodair-download-ids')
+    DOWNLOAD_IDS_CACHE_TTL = 3600
+
     def __init__(self):
 
         super().__init__()
 
         self.api_key = C.ENV_VARS['GEODAIR_API_KEY']
 
-        self.existing_data = None
-
         self.logger = aqlogging.setup_logger(
             name = 'Pollutants data update', log_filepath = self.LOGS_PATH)
 
 
-    def _fetch_download_id(self, date : str, pollutant : str):
+    def _get_download_id_cache_key(self, date : str, pollutant : str):
+        return f"{date}:{pollutant}"
+
+
+    def _get_cached_download_id(self, date : str, pollutant : str):
+        """Gets a download id cached in the last DOWNLOAD_IDS_CACHE_TTL seconds, or None."""
+
+        os.makedirs(os.path.dirname(self.DOWNLOAD_IDS_CACHE_PATH), exist_ok = True)
+        with shelve.open(self.DOWNLOAD_IDS_CACHE_PATH) as cache:
+            cached = cache.get(self._get_download_id_cache_key(date, pollutant))
+
+        if cached is None or time.time() - cached['ts'] > self.DOWNLOAD_IDS_CACHE_TTL:
+            return None
+
+        return cached['id']
+
+
+    def _cache_download_id(self, date : str, pollutant : str, download_id : str):
+
+        os.makedirs(os.path.dirname(self.DOWNLOAD_IDS_CACHE_PATH), exist_ok = True)
+        with shelve.open(self.DOWNLOAD_IDS_CACHE_PATH) as cache:
+            cache[self._get_download_id_cache_key(date, pollutant)] = {
+                'id' : download_id,
+                'ts' : time.time()
+            }
+
+
+    def _delete_cached_download_id(self, date : str, pollutant : str):
+
+        os.makedirs(os.path.dirname(self.DOWNLOAD_IDS_CACHE_PATH), exist_ok = True)
+        with shelve.open(self.DOWNLOAD_IDS_CACHE_PATH) as cache:
+            cache.pop(self._get_download_id_cache_key(date, pollutant), None)
+
+
+    async def _fetch_download_id(
+        self,
+        session : aiohttp.ClientSession,
+        semaphore : asyncio.Semaphore,
+        date : str,
+        pollutant : str
+    ):
+
+        # If a previous run already requested this file, reuse its download id.
+        download_id = self._get_cached_download_id(date, pollutant)
+        if download_id is not None:
+            return download_id
 
         query_params = {
             'date' : date,
@@ -682,29 +845,44 @@ class AirQualityDataManager(DataManager):
             'accept' : 'text/plain'
         }
 
-        response = self._get_api_response(self.REQUEST_API_URL, query_params, headers = headers)
+        async with semaphore:
+
+            async with session.get(
+                self.REQUEST_API_URL, params = query_params, headers = headers) as response:
+                status_code = response.status
+                text = await response.text()
+
+            # Don't bombard the API.
+            await asyncio.sleep(0.5)
 
         error_message_info = (
             f"Date: {date}, Pollutant: {pollutant}, Pollutant code: {query_params['polluant']}")
 
-        if response.status_code != 200:
+        if status_code != 200:
 
-            message = f"Unsuccessful Geod'Air request. Status code: {response.status_code}\n{error_message_info}"
+            message = f"Unsuccessful Geod'Air request. Status code: {status_code}\n{error_message_info}"
             self.logger.error(message)
 
             return None
 
-        if response.text[:7] != 'moyenne':
+        if text[:7] != 'moyenne':
 
-            message = f"Unexpected content from Geod'Air request: {response.text}\n{error_message_info}"
+            message = f"Unexpected content from Geod'Air request: {text}\n{error_message_info}"
             self.logger.error(message)
 
             return None
 
-        return response.text
+        self._cache_download_id(date, pollutant, text)
 
+        return text
 
-    def _download_file_stream(self, download_id : str):
+
+    async def _download_file_stream(
+        self,
+        session : aiohttp.ClientSession,
+        semaphore : asyncio.Semaphore,
+        download_id : str
+    ):
 
         query_params = {'id' : download_id}
 
@@ -713,100 +891,239 @@ class AirQualityDataManager(DataManager):
             'accept' : 'application/octet-stream'
         }
 
-        response =  self._get_api_response(self.DOWNLOAD_API_URL, query_params, headers = headers)
+        async with semaphore:
 
-        if response.status_code != 200:
+            # Keep the raw bytes so the CSV is only decoded once, when parsed.
+            async with session.get(
+                self.DOWNLOAD_API_URL, params = query_params, headers = headers) as response:
+                status_code = response.status
+                content = await response.read()
+                encoding = response.get_encoding()
+
+            # Don't bombard the API.
+            await asyncio.sleep(1)
+
+        if status_code != 200:
 
             message = (
-                f"Unsuccessful Geod'Air download request. Status code: {response.status_code}."
+                f"Unsuccessful Geod'Air download request. Status code: {status_code}."
                 f"Download id: {download_id}"
             )
             self.logger.error(message)
 
             return None
 
-        if response.text[:4] != 'Date':
+        if content[:4] != b'Date':
 
             message = (
-                f"Unexpected content from Geod'Air download request: {response.text}\n"
+                "Unexpected content from Geod'Air download request: "
+                f"{content.decode(encoding, errors = 'replace')}\n"
                 f"Download id: {download_id}"
             )
             self.logger.error(message)
 
             return None
 
-        return response.text
+        return content, encoding
+
+
+    def _get_backup_dir(self, date : str):
+        return os.path.join(self.BACKUPS_PATH, f"date={date}")
+
+
+    def _get_backup_partition_name(self, pollutant : str):
+        return f"pollutant={pollutant}"
+
+
+    def _get_backup_schema(self):
+        """Gets the pyarrow schema of the downloaded data columns we use."""
+
+        return pa.schema([
+            ('Date de début', pa.string()),
+            ('Polluant', pa.string()),
+            ('nom site', pa.string()),
+
+            # Concentrations may be missing for a whole day, so don't leave the
+            # type to be inferred.
+            ('valeur brute', pa.float64())
+        ])
+
+
+    def _get_backup_partitioning(self, *partition_names : str):
+        return ds.partitioning(
+            pa.schema([(name, pa.string()) for name in partition_names]), flavor = 'hive')
+
+
+    def _parse_download(self, content : bytes, encoding : str):
+
+        backup_schema = self._get_backup_schema()
+
+        return pacsv.read_csv(
+            pa.BufferReader(content),
+            read_options = pacsv.ReadOptions(encoding = encoding),
+            parse_options = pacsv.ParseOptions(delimiter = ';'),
+            convert_options = pacsv.ConvertOptions(
+                column_types = dict(zip(backup_schema.names, backup_schema.types))
+            )
+        )
+
+
+    def _save_backups(self, date : str, pollutant_tables : dict):
+        """Writes the downloaded data of a date for several pollutants in one pass.
+
+        Args:
+            date: String of date in the format yyyy-mm-dd.
+            pollutant_tables: Dictionary with strings of pollutants as keys and pyarrow
+                tables of their downloaded data as values.
+        """
+
+        backup_schema = self._get_backup_schema()
 
+        tables = []
 
-    def _download_file_exists(self, date : str, pollutant : str):
-        return os.path.exists(self._get_backup_path(date, pollutant))
+        for pollutant, table in pollutant_tables.items():
 
+            # Any other columns are inferred separately for each download, so keep only
+            # the columns we use, with their types fixed, so the tables can be combined.
+            table = table.select(backup_schema.names).cast(backup_schema)
 
-    def _get_backup_path(self, date : str, pollutant : str):
-        return os.path.join(self.BACKUPS_PATH, f"{pollutant}_{date}.gz")
+            # An empty table would not create a partition, and the partitions are how we
+            # tell which pollutants have been downloaded, so write an empty file instead.
+            if table.num_rows == 0:
+                path = os.path.join(
+                    self._get_backup_dir(date),
+                    self._get_backup_partition_name(pollutant),
+                    'part-0.parquet'
+                )
+                os.makedirs(os.path.dirname(path), exist_ok = True)
+                pq.write_table(table, path, compression = 'zstd')
+                continue
 
+            tables.append(
+                table
+                .append_column('date', pa.array([date] * table.num_rows, pa.string()))
+                .append_column('pollutant', pa.array([pollutant] * table.num_rows, pa.string()))
+            )
+
+        if not tables:
+            return
+
+        ds.write_dataset(
+            pa.concat_tables(tables),
+            self.BACKUPS_PATH,
+            format = 'parquet',
+            partitioning = self._get_backup_partitioning('date', 'pollutant'),
+            basename_template = 'part-{i}.parquet',
+            file_options = ds.ParquetFileFormat().make_write_options(compression = 'zstd'),
 
-    def _save_backup(self, content : str, date : str, pollutant : str):
-        data_df = pd.read_csv(StringIO(content), sep = ';')
-        path = self._get_backup_path(date, pollutant)
-        data_df.to_csv(path)
+            # Only the partitions of the pollutants just downloaded are written.
+            existing_data_behavior = 'overwrite_or_ignore'
+        )
 
 
     def _get_pollutants_to_request(self, date : str):
 
-        output = []
+        # Backups are partitioned by date then pollutant, so a single listing of the
+        # date's directory tells us which pollutants we already have.
+        backup_dir = self._get_backup_dir(date)
+        if os.path.isdir(backup_dir):
+            backup_partition_names = set(os.listdir(backup_dir))
+        else:
+            backup_partition_names = set()
 
         # Check which pollutants we need to get.
-        for pollutant in self.POLLUTANTS:
-            if not self._download_file_exists(date, pollutant):
-                output.append(pollutant)
+        return [
+            pollutant for pollutant in self.POLLUTANTS
+            if self._get_backup_partition_name(pollutant) not in backup_partition_names
+        ]
 
-        return output
 
+    async def _fetch_pollutant_download_ids(
+        self,
+        session : aiohttp.ClientSession,
+        semaphore : asyncio.Semaphore,
+        date : str,
+        pollutants : list[str]
+    ):
 
-    def _fetch_pollutant_download_ids(self, date : str, pollutants : list[str]):
+        responses = await asyncio.gather(*[
+            self._fetch_download_id(session, semaphore, date, pollutant)
+            for pollutant in pollutants
+        ])
 
-        download_ids = {}
+        return {
+            pollutant : response for pollutant, response in zip(pollutants, responses) if response
+        }
 
-        for pollutant in pollutants:
-            response = self._fetch_download_id(date, pollutant)
 
-            if response:
-                download_ids[pollutant] = self._fetch_download_id(date, pollutant)
-            time.sleep(0.5)
+    async def _fetch_required_pollutant_ids(
+        self,
+        session : aiohttp.ClientSession,
+        semaphore : asyncio.Semaphore,
+        date : str
+    ):
 
-        return download_ids
+        pollutants_to_request = self._get_pollutants_to_request(date)
+        return await self._fetch_pollutant_download_ids(
+            session, semaphore, date, pollutants_to_request)
 
-    def _fetch_required_pollutant_ids(self, date : str):
 
-        pollutants_to_request = self._get_pollutants_to_request(date)
-        return self._fetch_pollutant_download_ids(date, pollutants_to_request)
+    async def _download_file_streams(
+        self,
+        session : aiohttp.ClientSession,
+        semaphore : asyncio.Semaphore,
+        date : str,
+        download_ids : dict
+    ):
 
+        downloads = await asyncio.gather(*[
+            self._download_file_stream(session, semaphore, download_id)
+            for download_id in download_ids.values()
+        ], return_exceptions = True)
 
-    def _download_file_streams(self, date : str, download_ids : dict):
-        for pollutant, download_id in download_ids.items():
+        pollutant_tables = {}
+        errors = []
 
-            content = self._download_file_stream(download_id)
+        for pollutant, download in zip(download_ids.keys(), downloads):
 
-            if content:
-                self._save_backup(content, date, pollutant)
+            if isinstance(download, Exception):
+                errors.append(download)
+                download = None
 
-            time.sleep(1)
+            # The download id of a failed download may be bad, so don't reuse it when
+            # retrying.
+            if download is None:
+                self._delete_cached_download_id(date, pollutant)
+            else:
+                pollutant_tables[pollutant] = self._parse_download(*download)
 
+        if pollutant_tables:
+            self._save_backups(date, pollutant_tables)
 
-    def _single_fetch_data(self, date : str):
+        if errors:
+            raise errors[0]
 
-        download_ids = self._fetch_required_pollutant_ids(date)
+
+    async def _single_fetch_data(self, session : aiohttp.ClientSession, date : str):
+
+        # Don't bombard the API.
+        await _rate_limiter.wait_async('geodair')
+
+        # Limit the number of simultaneous requests to Geod'Air.
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        download_ids = await self._fetch_required_pollutant_ids(session, semaphore, date)
         pollutants_str = ', '.join(download_ids.keys()) if download_ids else 'None'
         self.logger.info(f"Fetching data of {date} for pollutants: {pollutants_str}")
 
         # Allow a few seconds for the files to be generated.
         if download_ids:
-            time.sleep(5)
+            await asyncio.sleep(5)
 
-        self._download_file_streams(date, download_ids)
+        await self._download_file_streams(session, semaphore, date, download_ids)
 
-        remaining_pollutant_ids = self._fetch_required_pollutant_ids(date)
+        remaining_pollutant_ids = await self._fetch_required_pollutant_ids(
+            session, semaphore, date)
 
         pollutants_str = ', '.join(remaining_pollutant_ids.keys()) if remaining_pollutant_ids else 'None'
         self.logger.info(f"Data fetched for {date}. Outstanding pollutants: {pollutants_str}")
@@ -814,41 +1131,75 @@ class AirQualityDataManager(DataManager):
         return remaining_pollutant_ids
 
 
-    def _get_merged_pollutants_data(self, date : str):
+    def _get_stations_filter(self):
+        """Gets a pyarrow expression that selects the rows of the stations used for each
+        pollutant, including stations recorded under a known misspelling."""
 
-        pollutant_data_dfs = []
-        for pollutant in self.POLLUTANTS:
-            pollutant_data_path = self._get_backup_path(date, pollutant)
-            pollutant_data_df = pd.read_csv(pollutant_data_path)
+        stations_filter = None
 
-            # Select only the columns we need.
-            pollutant_data_df = self._clean_columns_pollutants_data(pollutant_data_df)
+        for pollutant, stations in self.STATION_LOCATIONS.items():
 
-            # Select the appropriate locations.
-            pollutant_data_df = self._filter_pollutants_data_by_location(
-                pollutant_data_df, pollutant
-            ).copy()
+            station_names = stations + [
+                misspelling for misspelling, station in self.STATION_NAME_CORRECTIONS.items()
+                if station in stations
+            ]
 
-            # If we have no data at all for this date and pollutant then we copy
-            # from the day before.
-            if len(pollutant_data_df) == 0:
-                pollutant_data_df = self._get_filled_missing_day_data(date, pollutant)
+            pollutant_filter = (
+                (pc.field('pollutant') == pollutant) & pc.field('nom site').isin(station_names)
+            )
 
-            # Rename the valeur brute column.
-            pollutant_data_df.rename(columns = {'valeur brute' : 'Concentration'}, inplace = True)
+            if stations_filter is None:
+                stations_filter = pollutant_filter
+            else:
+                stations_filter = stations_filter | pollutant_filter
 
-            pollutant_data_dfs.append(pollutant_data_df)
+        return stations_filter
 
-            merged_data = pd.concat(pollutant_data_dfs).reset_index(drop = True)
 
-        return merged_data
+    def _read_backups(self, date : str):
 
+        backup_schema = self._get_backup_schema().append(pa.field('pollutant', pa.string()))
 
-    def _get_previous_day_data(self, date : str, pollutant : str):
+        dataset = ds.dataset(
+            self._get_backup_dir(date),
+            schema = backup_schema,
+            format = 'parquet',
+            partitioning = self._get_backup_partitioning('pollutant')
+        )
 
-        previous_day = pd.to_datetime(date).date() - pd.Timedelta(1, 'day')
+        return dataset.to_table(filter = self._get_stations_filter()).to_pandas()
+
+
+    def _get_merged_pollutants_data(self, date : str, existing_data : pd.DataFrame):
+
+        # Read the data of all pollutants at once, selecting the appropriate locations.
+        pollutants_data_df = self._read_backups(date)
+        pollutants_with_data = set(pollutants_data_df['pollutant'].unique())
+
+        # Select only the columns we need.
+        pollutants_data_df = self._clean_columns_pollutants_data(pollutants_data_df)
+        pollutants_data_df = self._correct_station_names(pollutants_data_df)
+
+        pollutant_data_dfs = [pollutants_data_df]
+
+        # If we have no data at all for this date and pollutant then we copy
+        # from the day before.
+        for pollutant in self.POLLUTANTS:
+            if pollutant not in pollutants_with_data:
+                pollutant_data_dfs.append(
+                    self._get_filled_missing_day_data(date, pollutant, existing_data))
+
+        merged_data = self._concat_data(pollutant_data_dfs, ignore_index = True)
+
+        # Rename the valeur brute column.
+        merged_data.rename(columns = {'valeur brute' : 'Concentration'}, inplace = True)
+
+        return merged_data
 
-        existing_data = self.get_existing_data_df()
+
+    def _get_previous_day_data(self, date : str, pollutant : str, existing_data : pd.DataFrame):
+
+        previous_day = datetime.date.fromisoformat(date) - _ONE_DAY
 
         previous_day_data = existing_data[
             (existing_data['Polluant'] == pollutant) &
@@ -858,12 +1209,13 @@ class AirQualityDataManager(DataManager):
         return previous_day_data
 
 
-    def _get_filled_missing_day_data(self, date : str, pollutant : str):
+    def _get_filled_missing_day_data(
+        self, date : str, pollutant : str, existing_data : pd.DataFrame):
 
-        filled_day_data = self._get_previous_day_data(date, pollutant).copy()
+        filled_day_data = self._get_previous_day_data(date, pollutant, existing_data)
 
         # Shift the datetime forward by one day.
-        filled_day_data['Datetime'] = filled_day_data['Datetime'] + pd.Timedelta(1, 'Day')
+        filled_day_data['Datetime'] = filled_day_data['Datetime'] + _ONE_DAY
 
         # Modify columns so format matches fetched data.
         filled_day_data['nom site'] = 'Dummy site'
@@ -874,9 +1226,9 @@ class AirQualityDataManager(DataManager):
 
 
 
-    def _get_cleaned_fetched_pollutants_data(self, date : str):
+    def _get_cleaned_fetched_pollutants_data(self, date : str, existing_data : pd.DataFrame):
 
-        fetched_data = self._get_merged_pollutants_data(date)
+        fetched_data = self._get_merged_pollutants_data(date, existing_data)
 
         cleaned_df = self._get_non_positive_values_replaced_with_nan(fetched_data)
 
@@ -885,16 +1237,16 @@ class AirQualityDataManager(DataManager):
         return averaged_data
 
 
-    def _get_filled_data(self, data : pd.DataFrame):
+    def _get_filled_data(self, data : pd.DataFrame, existing_data : pd.DataFrame):
 
-        data_filled_with_whole_days = self._get_data_filled_with_whole_days(data)
+        data_filled_with_whole_days = self._get_data_filled_with_whole_days(data, existing_data)
 
         filled_data = self._fill_missing_values(data_filled_with_whole_days)
 
         return filled_data
 
 
-    def _get_data_filled_with_whole_days(self, data):
+    def _get_data_filled_with_whole_days(self, data, existing_data : pd.DataFrame):
 
         pollutant_days_to_copy = self._get_days_needing_replacement(data)
 
@@ -906,8 +1258,6 @@ class AirQualityDataManager(DataManager):
             data, pollutant_days_to_copy
         )
 
-        existing_data = self.get_existing_data_df()
-
         return self._replace_copied_days_data(
             existing_data,
             fetched_data_excl_days_needing_replacement,
@@ -931,12 +1281,7 @@ class AirQualityDataManager(DataManager):
     def _clean_columns_pollutants_data(self, pollutant_data_df : pd.DataFrame):
 
         # Select only the columns we need.
-        pollutant_data_df = pollutant_data_df[[
-            'Date de début',
-            'Polluant',
-            'nom site',
-            'valeur brute'
-        ]].copy()
+        pollutant_data_df = pollutant_data_df[self.DATA_COLUMNS]
 
         # Rename the datetime column
         pollutant_data_df.rename(columns = {'Date de début' : 'Datetime'}, inplace = True)
@@ -944,24 +1289,26 @@ class AirQualityDataManager(DataManager):
         # Convert the datetime column type.
         pollutant_data_df['Datetime'] = pd.to_datetime(pollutant_data_df['Datetime'])
 
+        # Store the repeated strings as categories.
+        pollutant_data_df['Polluant'] = pollutant_data_df['Polluant'].astype('category')
+        pollutant_data_df['nom site'] = pollutant_data_df['nom site'].astype('category')
+
         return pollutant_data_df
 
 
-    def _filter_pollutants_data_by_location(self, df : pd.DataFrame, pollutant : str):
+    def _correct_station_names(self, df : pd.DataFrame):
 
         # Correct known location misspellings.
-        df.loc[df['nom site'] == 'Chaptal', 'nom site'] = 'Montpellier Chaptal'
-        df.loc[df['nom site'] == 'Saint Denis', 'nom site'] = 'Montpellier St Denis'
-
-        # Select
-        df = df[df['nom site'].isin(self.STATION_LOCATIONS[pollutant])]
+        df['nom site'] = df['nom site'].replace(self.STATION_NAME_CORRECTIONS)
 
         return df
 
 
     def _get_non_positive_values_replaced_with_nan(self, df: pd.DataFrame):
-        output = df.copy()
-        output.loc[output['Concentration'] <= 0, 'Concentration'] = np.nan
+        # Assigning a whole new column leaves the data of `df` untouched, so a
+        # shallow copy is enough.
+        output = df.copy(deep = False)
+        output['Concentration'] = output['Concentration'].where(output['Concentration'] > 0)
         return output
 
 
@@ -974,7 +1321,7 @@ class AirQualityDataManager(DataManager):
             return None
 
         null_values['Null value'] = 1
-        null_values['Date'] = null_values['Datetime'].dt.date
+        null_values['Date'] = null_values['Datetime'].dt.normalize()
 
         count_null_values_by_day = null_values.pivot_table(
             index = ['Polluant', 'Date'],
@@ -991,45 +1338,38 @@ class AirQualityDataManager(DataManager):
         if len(pollutant_days_to_copy) == 0:
             return None
 
-        pollutant_days_to_copy['Polluant-Date'] = (
-            pollutant_days_to_copy['Polluant'] + ' ' + pollutant_days_to_copy['Date'].astype('str')
-        )
-
         return pollutant_days_to_copy
 
 
     def _get_data_without_days_to_replace(
         self, fetched_data : pd.DataFrame, pollutant_days_to_copy : pd.DataFrame):
 
-        fetched = fetched_data.copy()
-        fetched['Polluant-Date'] = fetched['Polluant'] + ' ' + fetched['Datetime'].dt.strftime('%Y-%m-%d')
+        fetched = fetched_data.copy(deep = False)
+        fetched['Date'] = fetched['Datetime'].dt.normalize()
 
         fetched_data_merged_with_days_to_copy = (
             fetched.merge(
-                pollutant_days_to_copy.drop(columns = ['Polluant']),
+                pollutant_days_to_copy,
                 how = 'left',
-                on = 'Polluant-Date'
+                on = ['Polluant', 'Date'],
+                indicator = True
             )
         )
 
         fetched_data_merged_without_days_to_copy = fetched_data_merged_with_days_to_copy[
-            fetched_data_merged_with_days_to_copy['Date'].isna()
-        ].drop(columns = ['Date'])
+            fetched_data_merged_with_days_to_copy['_merge'] == 'left_only'
+        ].drop(columns = ['Date', '_merge'])
 
         return fetched_data_merged_without_days_to_copy
 
 
-    def _same_day_last_year(self, polluant_date):
-
-        polluant, date = polluant_date.split(' ')
-        year = int(date[:4])
+    def _same_day_last_year(self, date : pd.Timestamp):
 
-        # Set the month and day to fetch, handling leap years.
-        month_day = date[4:]
-        if month_day == '-02-29':
-            month_day = '-02-28'
+        # Handle leap years by using 28 February in place of 29 February.
+        if date.month == 2 and date.day == 29:
+            date = date.replace(day = 28)
 
-        return f"{polluant} {year - 1}{month_day}"
+        return date.replace(year = date.year - 1)
 
 
     def _replace_copied_days_data(
@@ -1039,39 +1379,43 @@ class AirQualityDataManager(DataManager):
         pollutant_days_to_copy : pd.DataFrame
     ):
 
-        existing_copy = existing_data.copy()
         data_to_concat = [fetched_data_merged_without_days_to_copy]
 
-        existing_copy['Polluant-Date'] = (
-            existing_copy['Polluant'] + ' ' + existing_data['Datetime'].dt.strftime('%Y-%m-%d'))
+        # Index the existing data by pollutant and day once, so that each day to copy
+        # is a lookup rather than a scan of the whole dataframe.
+        existing_data_by_day = existing_data.set_index(
+            [existing_data['Polluant'].rename(None), existing_data['Datetime'].dt.normalize()]
+        ).sort_index()
 
-        for polluant_date in pollutant_days_to_copy['Polluant-Date']:
-            slice_to_copy = existing_copy[
-                existing_copy['Polluant-Date'] == \
-                    self._same_day_last_year(polluant_date)
-            ]
+        for pollutant, date in zip(pollutant_days_to_copy['Polluant'], pollutant_days_to_copy['Date']):
 
-            data_to_copy = slice_to_copy.copy()
+            same_day_last_year = self._same_day_last_year(date)
 
-            data_to_copy['Datetime'] = pd.to_datetime(
-                polluant_date[-10:] + ' ' + data_to_copy['Datetime'].dt.strftime('%H:%M:%S')
-            )
+            try:
+                data_to_copy = existing_data_by_day.loc[
+                    [(pollutant, same_day_last_year)]
+                ].reset_index(drop = True)
+            except KeyError:
+                continue
+
+            # Shift the copied times onto the date being replaced.
+            data_to_copy['Datetime'] = data_to_copy['Datetime'] + (date - same_day_last_year)
 
-            data_to_copy['Polluant-Date'] = data_to_copy['Polluant-Date'].str[:-10] + polluant_date[-10:]
             data_to_concat.append(data_to_copy)
 
-        return pd.concat(data_to_concat).sort_values(
+        return self._concat_data(data_to_concat, ignore_index = True).sort_values(
             by = ['Polluant', 'Datetime']
-        ).drop(columns = 'Polluant-Date')
+        )
 
 
     def _add_processed_fetched_data_to_existing(self, processed_fetched_data):
 
-        existing_data = self.get_existing_data_df(temp = True)
+        existing_data = self.get_existing_data_df()
 
         update_existing_data = (
-            pd.concat(
-                [existing_data, processed_fetched_data]
+            self._concat_data(
+                [existing_data, processed_fetched_data],
+                ignore_index = True
             )
 
             # Shouldn't be duplicates, but just in case...
@@ -1082,56 +1426,82 @@ class AirQualityDataManager(DataManager):
         )
 
         return update_existing_data.sort_values(
-            by = ['Polluant', 'Datetime']
-        ).reset_index(drop = True)
+            by = ['Polluant', 'Datetime'],
+            ignore_index = True
+        )
+
 
+    async def _run_update(self, session : aiohttp.ClientSession, date : str):
+        """Fetches the data of a date and adds it to the existing data if complete.
 
-    def _run_update(self, date : str):
+        Args:
+            session: aiohttp ClientSession to make the requests to Geod'Air with.
+            date: String of date in the format yyyy-mm-dd.
+
+        Returns:
+            True if the existing data was updated, otherwise False.
+        """
 
         # Log beginning of process.
         self.logger.info(f"Initiating air quality data update for {date}")
 
         # Fetch data.
-        outstanding_download_ids = self._single_fetch_data(date)
+        outstanding_download_ids = await self._single_fetch_data(session, date)
 
         # Only update existing stored data if we have data for all pollutants.
         if len(outstanding_download_ids.keys()) == 0:
 
+            # Read the existing data once for use by all the processing steps.
+            existing_data = self.get_existing_data_df()
+
             # Get the stored update data and process it.
-            cleaned_fetched_data = self._get_cleaned_fetched_pollutants_data(date)
+            cleaned_fetched_data = self._get_cleaned_fetched_pollutants_data(date, existing_data)
 
             # Merge with existing data.
             updated_data = self._add_processed_fetched_data_to_existing(cleaned_fetched_data)
 
-            filled_data = self._get_filled_data(updated_data)
+            filled_data = self._get_filled_data(updated_data, existing_data)
 
             # Store new data.
-            self.save_existing_data_df(filled_data, temp = True)
+            self.save_existing_data_df(filled_data)
 
             # Log attempt to update saved data.
             self.logger.info(f"Air quality data updated for {date}")
 
+            return True
+
+        return False
 
-    def _update_next_day(self):
+
+    async def _update_next_day(
+        self,
+        session : aiohttp.ClientSession,
+        next_day_to_fetch : datetime.date,
+        yesterday : datetime.date
+    ):
+        """Attempts to update the existing data with the next day's data.
+
+        Returns:
+            datetime.date object of the next day to fetch after this attempt, or None if
+            the attempt failed.
+        """
 
         try:
 
             # First check that the next day's data is available.
-            today = self._today()
-            yesterday = today - pd.Timedelta(1, 'day')
-
-            next_day_to_fetch = self.get_next_day_to_fetch(temp = True)
             if next_day_to_fetch > yesterday:
                 self.logger.warning(
                     f"Can't update next day's pollutants data ({next_day_to_fetch}) "
                     "as it is not available yet.")
-                return False
+                return None
 
-            update_date_str = next_day_to_fetch.strftime('%Y-%m-%d')
+            update_date_str = next_day_to_fetch.isoformat()
 
-            self._run_update(update_date_str)
+            # If some pollutants are still outstanding, we try the same day again.
+            if await self._run_update(session, update_date_str):
+                return next_day_to_fetch + _ONE_DAY
 
-            return True
+            return next_day_to_fetch
 
 
         except Exception as e:
@@ -1139,9 +1509,10 @@ class AirQualityDataManager(DataManager):
             self._handle_error(
                 e, message = f"Error occured when updating air quality data for {next_day_to_fetch}")
 
-            return False
+            return None
 
 
+    @_with_copy_on_write
     def update_to_yesterday(self):
         """Updates pollutant data to yesterday if possible.
 
@@ -1150,21 +1521,29 @@ class AirQualityDataManager(DataManager):
         fetched as well.
         """
 
+        yesterday = self._today() - _ONE_DAY
+
+        next_day_to_fetch = self.get_next_day_to_fetch()
+
+        asyncio.run(self._update_days(next_day_to_fetch, yesterday))
+
+
+    async def _update_days(self, next_day_to_fetch : datetime.date, yesterday : datetime.date):
+
         max_attempts = 5
 
         attempt = 1
 
-        no_fails = True
-
-        while attempt <= max_attempts and no_fails:
+        # Share one session between all the attempts so that connections to Geod'Air
+        # are reused.
+        async with aiohttp.ClientSession() as session:
 
-            no_fails = self._update_next_day()
+            while attempt <= max_attempts and next_day_to_fetch is not None:
 
-            # Don't bombard the API.
-            if no_fails:
-                time.sleep(1)
+                next_day_to_fetch = await self._update_next_day(
+                    session, next_day_to_fetch, yesterday)
 
-            attempt += 1
+                attempt += 1
 
 
 class HistoricalWeatherDataManager(DataManager):
@@ -1172,14 +1551,21 @@ class HistoricalWeatherDataManager(DataManager):
 
     Attributes:
         EXISTING_DATA_FILENAME: String of filename of the current weather forecast data.
-        BACKUPS_PATH: String of path to the folder where downloaded data is stored
+        BACKUPS_PATH: String of path to the folder where downloaded data is stored, as one
+            Feather file per day.
         LOGS_PATH: String of path to the log file.
         LOCATION_COORDINATES: Dictionary with keys of locations of weather data and values
             of geographic coordinates as a tuple.
         LOCATIONS: List of locations of weather data as strings.
+        LOCATION_DTYPE: Pandas categorical dtype of the location column.
         DATA_COLUMNS: List of strings representing data types to be requested via API.
         CACHE_DIR: String of path to directory where Meteostat library caches data.
         CACHE_AGE: Integer representing maximum age of a file in seconds in the Meteostat cache.
+        FILL_CONTEXT: Pandas timedelta of how much of the end of the existing data is used
+            when filling missing values in new data.
+        STATION_IDS_CACHE_PATH: String of path to the JSON file caching the nearest station
+            ids, so they are not looked up on every run.
+        STATION_IDS_CACHE_TTL: Pandas timedelta of how long cached station ids are used for.
         logger: A logger instance from the Python logging module. Set by subclass.
         existing_data: A Pandas dataframe containing the existing data.
         station_ids: A dictionary with keys of locations as string, and values os strings
@@ -1198,11 +1584,25 @@ class HistoricalWeatherDataManager(DataManager):
 
     LOCATIONS = list(LOCATION_COORDINATES.keys())
 
+    # Sorted like the location column of the existing data.
+    LOCATION_DTYPE = pd.CategoricalDtype(sorted(LOCATIONS))
+
+    # Locations with their latitude and longitude, for iterating over.
+    _LOCATION_ITEMS = tuple(
+        (location, latitude, longitude)
+        for location, (latitude, longitude) in LOCATION_COORDINATES.items()
+    )
+
     DATA_COLUMNS = ['dwpt', 'pres', 'rhum', 'temp', 'wdir', 'wspd']
 
     CACHE_DIR = os.path.join(DataManager.BASE_BACKUPS_PATH, 'historical weather cache')
     CACHE_AGE = 60
 
+    FILL_CONTEXT = pd.Timedelta(48, 'hours')
+
+    STATION_IDS_CACHE_PATH = os.path.join(C.WORK_DIR, 'cache', 'station-ids.json')
+    STATION_IDS_CACHE_TTL = pd.Timedelta(30, 'days')
+
     def __init__(self):
 
         super().__init__()
@@ -1210,24 +1610,60 @@ class HistoricalWeatherDataManager(DataManager):
         self.logger = aqlogging.setup_logger(
             name = 'Historical weather data update', log_filepath = self.LOGS_PATH)
         self.station_ids = None
-        self.existing_data = None
 
         Hourly.max_age = self.CACHE_AGE
         Hourly.cache_dir = self.CACHE_DIR
 
 
+    def _fetch_cached_station_ids(self):
+        """Gets the station ids cached on disk if they are less than STATION_IDS_CACHE_TTL old.
+
+        Returns:
+            None if not cached, expired or cached for different locations, otherwise the
+            station ids as a dictionary.
+        """
+
+        if not os.path.exists(self.STATION_IDS_CACHE_PATH):
+            return None
+
+        cache_age = time.time() - os.path.getmtime(self.STATION_IDS_CACHE_PATH)
+        if cache_age > self.STATION_IDS_CACHE_TTL.total_seconds():
+            return None
+
+        with open(self.STATION_IDS_CACHE_PATH, 'r') as file:
+            station_ids = json.load(file)
+
+        # A location added since the ids were cached would otherwise be skipped.
+        if set(station_ids) != set(self.LOCATIONS):
+            return None
+
+        return station_ids
+
+
+    def _cache_station_ids(self, station_ids : dict):
+
+        os.makedirs(os.path.dirname(self.STATION_IDS_CACHE_PATH), exist_ok = True)
+        with open(self.STATION_IDS_CACHE_PATH, 'w') as file:
+            json.dump(station_ids, file)
+
+
     def _get_nearest_station_ids(self):
 
         # Return cached data if we have it.
         if self.station_ids is not None:
             return self.station_ids
 
-        stations = Stations()
+        self.station_ids = self._fetch_cached_station_ids()
+        if self.station_ids is not None:
+            return self.station_ids
+
         nearest_station_ids = {}
 
         fetch_success = True
-        for location, coords in self.LOCATION_COORDINATES.items():
-            stations = stations.nearby(coords[0], coords[1])
+        for location, latitude, longitude in self._LOCATION_ITEMS:
+
+            # Search all stations for each location.
+            stations = Stations().nearby(latitude, longitude)
             if isinstance(stations, Stations):
                 nearest_station_ids[location] = stations.fetch(1).index[0]
             else:
@@ -1237,10 +1673,40 @@ class HistoricalWeatherDataManager(DataManager):
 
         # Cache for next time.
         self.station_ids = nearest_station_ids if fetch_success else None
+        if fetch_success:
+            self._cache_station_ids(nearest_station_ids)
 
         return self.station_ids
 
 
+    def _fetch_location_hourly_data(
+        self, location : str, station_id : str, start : datetime.datetime, end : datetime.datetime):
+
+        # Fetch hourly data and add location column.
+        hourly_data = Hourly(station_id, start, end)
+
+        if not isinstance(hourly_data, Hourly):
+            self.logger.warning(f"Error fetching {location} data for {start} to {end}")
+            return None
+
+        hourly_data_df = hourly_data.fetch()
+
+        if not isinstance(hourly_data_df, pd.DataFrame) or len(hourly_data_df) == 0:
+            self.logger.warning(f"Error creating {location} dataframe for {start} to {end}")
+            return None
+
+        # Keep only the columns we use, with the location first.
+        hourly_data_df = hourly_data_df[self.DATA_COLUMNS]
+        hourly_data_df.insert(0, 'location', pd.Categorical(
+            [location] * len(hourly_data_df), dtype = self.LOCATION_DTYPE))
+
+        # Meteostat returns the data in time order, so this is only a safeguard.
+        if not hourly_data_df.index.is_monotonic_increasing:
+            hourly_data_df.sort_index(inplace = True)
+
+        return hourly_data_df
+
+
     def _fetch_hourly_data(self, start_date : str, end_date : str):
 
         station_ids = self._get_nearest_station_ids()
@@ -1251,91 +1717,105 @@ class HistoricalWeatherDataManager(DataManager):
             )
             return None
 
-        start = pd.to_datetime(f"{start_date} 00:00:00")
-        end = pd.to_datetime(f"{end_date} 23:59:59")
+        start = datetime.datetime.combine(datetime.date.fromisoformat(start_date), datetime.time())
+        end = datetime.datetime.combine(
+            datetime.date.fromisoformat(end_date), datetime.time(23, 59, 59))
 
         self.logger.info(f"Fetching hourly data for {start_date} to {end_date}")
 
-        hourly_data_dfs = []
-        fetch_success = True
-        for location, station_id in station_ids.items():
-
-            # Fetch hourly data and add location column.
-            hourly_data = Hourly(station_id, start, end)
-
-            if not isinstance(hourly_data, Hourly):
-                self.logger.warning(f"Error fetching {location} data for {start_date} to {end_date}")
-                fetch_success = False
+        # Don't bombard the API.
+        _rate_limiter.wait('meteostat')
 
-            hourly_data_df = hourly_data.fetch()
+        # The fetches are all waiting on the network, so run them at the same time.
+        with ThreadPoolExecutor(max_workers = len(station_ids)) as executor:
+            hourly_data_dfs = list(executor.map(
+                lambda location_station_id: self._fetch_location_hourly_data(
+                    *location_station_id, start, end),
+                station_ids.items()
+            ))
 
-            if not isinstance(hourly_data_df, pd.DataFrame) or len(hourly_data_df) == 0:
-                self.logger.warning(f"Error creating {location} dataframefor {start_date} to {end_date}")
-                fetch_success = False
+        if any(hourly_data_df is None for hourly_data_df in hourly_data_dfs):
+            return None
 
-            hourly_data_df['location'] = location
+        # Keep the time index, which the backups are split by.
+        return self._concat_data(hourly_data_dfs, sort = False)
 
-            hourly_data_df.sort_index(inplace = True)
 
-            hourly_data_dfs.append(hourly_data_df)
+    def _get_backup_path(self, date : str):
+        return os.path.join(self.BACKUPS_PATH, f"{date}.feather")
 
-        if not fetch_success:
-            return None
 
-        output = pd.concat(hourly_data_dfs)
+    def _get_legacy_backup_path(self, date : str):
+        return os.path.join(self.BACKUPS_PATH, f"{date}.gz")
 
-        # Drop unused columns.
-        required_columns = ['location']
-        required_columns.extend(self.DATA_COLUMNS)
 
-        return output[required_columns]
+    def _migrate_legacy_backup(self, date : str):
+        """Rewrites a backup saved as gzipped CSV in the Feather format, keeping the original."""
 
+        legacy_data = pd.read_csv(self._get_legacy_backup_path(date), parse_dates = ['time'])
+        legacy_data.to_feather(self._get_backup_path(date), compression = 'zstd')
 
-    def _fetch_hourly_data_for_date(self, date : str):
-        return self._fetch_hourly_data(date, date)
 
+    def _backup_file_exists(self, date : str):
 
-    def _get_backup_path(self, date : str):
-        return os.path.join(self.BACKUPS_PATH, f"{date}.gz")
+        if os.path.exists(self._get_backup_path(date)):
+            return True
 
+        if os.path.exists(self._get_legacy_backup_path(date)):
+            self._migrate_legacy_backup(date)
+            return True
 
-    def _backup_file_exists(self, date : str):
-        return os.path.exists(self._get_backup_path(date))
+        return False
 
 
     def _save_backup(self, date : str, hourly_data : pd.DataFrame):
-        hourly_data.to_csv(self._get_backup_path(date))
+        hourly_data.reset_index().to_feather(self._get_backup_path(date), compression = 'zstd')
         self.logger.info(f"Attempted backup of fetched data for {date}")
 
 
-    def _fetch_and_save_data_for_date(self, date : str, prevent_date_gaps = True):
+    def _fetch_and_save_data_for_dates(self, dates : list[str], prevent_date_gaps = True):
+
+        dates_str = f"{dates[0]} to {dates[-1]}"
 
         try:
 
             # Check we aren't missing the previous day.
             if prevent_date_gaps:
-                if not self._previous_days_data_exists(date, temp = True):
+                if not self._previous_days_data_exists(dates[0]):
                     self.logger.warning(
-                        f"Data not fetched for {date} because previous day's data not found.")
+                        f"Data not fetched for {dates_str} because previous day's data not found.")
                     return False
 
-            # Check we haven't already got the data.
-            if self._backup_file_exists(date):
-                self.logger.info(f"Data not fetched for {date} because data already exists.")
+            # Check which dates we haven't already got.
+            dates_to_fetch = [date for date in dates if not self._backup_file_exists(date)]
+            if not dates_to_fetch:
+                self.logger.info(f"Data not fetched for {dates_str} because data already exists.")
                 return True
 
+            # Fetch all the dates in one request per location.
+            hourly_data = self._fetch_hourly_data(dates_to_fetch[0], dates_to_fetch[-1])
+            if hourly_data is None:
+                return False
+
+            # Back up each day separately, stopping at the first day that some station has
+            # not published yet so that it is fetched again next time.
+            days_data = dict(tuple(hourly_data.groupby(hourly_data.index.date)))
+            for date in dates_to_fetch:
+
+                day_data = days_data.get(datetime.date.fromisoformat(date))
+                if day_data is None or day_data['location'].nunique() < len(self.LOCATIONS):
+                    self.logger.warning(f"Backup not saved for {date} as data is incomplete.")
+                    break
 
-            hourly_data = self._fetch_hourly_data_for_date(date)
-            if hourly_data is not None:
-                self._save_backup(date, hourly_data)
+                self._save_backup(date, day_data)
                 self.logger.info(f"Backup saved for {date}")
 
-                return True
+            return True
 
         except Exception as e:
 
             self._handle_error(
-                e, message = f"Error occured when fetching and saving historical weather data for {date}")
+                e, message = f"Error occured when fetching and saving historical weather data for {dates_str}")
 
             return False
 
@@ -1345,125 +1825,219 @@ class HistoricalWeatherDataManager(DataManager):
         if not self._backup_file_exists(date):
             return None
 
-        data = pd.read_csv(self._get_backup_path(date))
+        # Feather keeps the datetime type, so there is no need to parse the times.
+        data = pd.read_feather(self._get_backup_path(date))
         data.rename(columns = {'time' : 'Datetime'}, inplace = True)
-        data['Datetime'] = pd.to_datetime(data['Datetime'])
+
+        # Backups saved before locations were categorical have them as strings.
+        data['location'] = data['location'].astype(self.LOCATION_DTYPE)
 
         return data
 
 
-    def _get_merged_new_and_existing_data(self, date : str):
+    def _get_new_data(self, dates : list[str]):
 
-        existing_data_df = self.get_existing_data_df(temp = True)
-        new_data = self._fetch_backedup_data(date)
-        if new_data is None:
-            self.logger.warning(
-                f"Could not merge data of {date} with existing data as "
-                f"{date} data has not been fetched.")
-            return None
+        # Get the backed up data of each date in turn, stopping at the first date missing.
+        new_data_dfs = []
+        for date in dates:
 
-        # Check that the new data follows on from the existing data.
-        existing_data_last_time = self.get_existing_data_last_time(temp = True)
-        new_data_first_time = new_data['Datetime'].min()
+            day_data = self._fetch_backedup_data(date)
+            if day_data is None:
+                self.logger.warning(
+                    f"Could not merge data of {date} with existing data as "
+                    f"{date} data has not been fetched.")
+                break
 
-        if new_data_first_time != existing_data_last_time + pd.Timedelta(1, 'hour'):
-            self.logger.warning(
-                f"Cannot merge data of {date} with existing data because the existing data"
-                f" ends at {existing_data_last_time} and the new data begins at "
-                f"{new_data_first_time}. There cannot be a gap between the two."
-            )
+            new_data_dfs.append(day_data)
+
+        if not new_data_dfs:
             return None
 
-        merged_data = (
-            pd.concat([existing_data_df, new_data])
-            .sort_values(by = ['location', 'Datetime'])
-            .reset_index(drop = True)
+        return self._concat_data(new_data_dfs, ignore_index = True)
+
+
+    def _get_processed_new_data(self, new_data : pd.DataFrame):
+        """Fills missing values and fixes error values of the new data only.
+
+        The existing data has already been processed, so only its last FILL_CONTEXT
+        is included to give the interpolation the values preceding the new data.
+        """
+
+        existing_data_df = self.get_existing_data_df()
+        existing_data_last_time = self.get_existing_data_last_time()
+
+        context_data = existing_data_df[
+            existing_data_df['Datetime'] > existing_data_last_time - self.FILL_CONTEXT
+        ]
+
+        # Context data first so that the location column comes first.
+        processed_data = self._fix_error_values(
+            self._fill_missing_values(
+                self._concat_data([context_data, new_data], ignore_index = True)
+            )
         )
 
+        return processed_data[processed_data['Datetime'] > existing_data_last_time]
+
+
+    def _has_time_gaps(self, new_data : pd.DataFrame):
+        """Checks whether processed new data has any gaps.
+
+        The data of each location must begin an hour after the existing data ends and
+        continue hourly. All adjacent times are checked in one pass.
+
+        Args:
+            new_data: Pandas dataframe of processed new data, sorted by location then time.
+
+        Returns:
+            True if there is a gap, otherwise False.
+        """
+
+        times = new_data['Datetime'].to_numpy()
+        location_codes = new_data['location'].cat.codes.to_numpy()
+
+        is_location_start = np.concatenate([[True], location_codes[1:] != location_codes[:-1]])
+
+        first_time = np.datetime64(self.get_existing_data_last_time() + _ONE_HOUR, 'ns')
+        starts_after_existing_data = (times[is_location_start] == first_time).all()
+
+        is_hourly = (np.diff(times)[~is_location_start[1:]] == np.timedelta64(1, 'h')).all()
+
+        return not (starts_after_existing_data and is_hourly)
+
+
+    def _get_merged_new_and_existing_data(self, new_data : pd.DataFrame):
+
+        existing_data_df = self.get_existing_data_df()
+
+        # The existing data is sorted by location then time and the new data follows on
+        # from it, so appending each location's new data to that location's existing data
+        # keeps everything sorted without sorting the whole dataframe again.
+        new_data_by_location = dict(tuple(new_data.groupby('location', observed = True, sort = False)))
+
+        data_to_concat = []
+        for location, location_existing_data in existing_data_df.groupby(
+            'location', observed = True, sort = False):
+            data_to_concat.append(location_existing_data)
+            if location in new_data_by_location:
+                data_to_concat.append(new_data_by_location[location])
+
+        merged_data = self._concat_data(data_to_concat, ignore_index = True)
+
+        if C.ENV_VARS['DEBUG']:
+            assert merged_data.groupby(
+                'location', observed = True)['Datetime'].is_monotonic_increasing.all()
+
         return merged_data
 
 
+    def _get_mean_dewpoint(self, dwpt : np.ndarray):
+        """Gets the mean of the dewpoints given, ignoring missing values.
+
+        The data being fixed only covers a short window, so if it has no valid dewpoints
+        the mean of the existing data, which has already been fixed, is used instead.
+        """
+
+        valid_dwpt = dwpt[~np.isnan(dwpt)]
+        if valid_dwpt.size == 0:
+            return self.get_existing_data_df()['dwpt'].mean()
+
+        return valid_dwpt.mean()
+
+
     def _fix_error_values(self, df):
 
-        # Set any lowe dewpoint values to the mean.
-        df.loc[df['dwpt'] < -10, 'dwpt'] = df['dwpt'].mean()
+        # Set any low dewpoint values to the mean of the other values, so that the
+        # error values don't bias it.
+        dwpt = df['dwpt'].to_numpy()
+        error_values = dwpt < -10
+        if error_values.any():
+            df['dwpt'] = np.where(error_values, self._get_mean_dewpoint(dwpt[~error_values]), dwpt)
 
         # Set any high relative humidity values to 100.
-        df.loc[df['rhum'] > 100, 'rhum'] = 100
+        df['rhum'] = np.minimum(df['rhum'].to_numpy(), 100)
 
         return df
 
 
-    def _merge_new_and_existing_data(self, date : str):
+    def _merge_new_and_existing_data(self, dates : list[str]):
+
+        dates_str = f"{dates[0]} to {dates[-1]}"
 
         try:
 
-            merged_data = self._get_merged_new_and_existing_data(date)
+            new_data = self._get_new_data(dates)
 
-            if merged_data is None:
+            if new_data is None:
                 return False
 
-            filled_data = self._fill_missing_values(merged_data)
+            processed_new_data = self._get_processed_new_data(new_data)
+
+            # Check that the new data follows on from the existing data.
+            if self._has_time_gaps(processed_new_data):
+                self.logger.warning(
+                    f"Cannot merge data of {dates_str} with existing data because the existing"
+                    f" data ends at {self.get_existing_data_last_time()} and the new data does"
+                    " not continue hourly from then. There cannot be a gap between the two."
+                )
+                return False
 
-            fixed_values = self._fix_error_values(filled_data)
+            merged_data = self._get_merged_new_and_existing_data(processed_new_data)
 
-            self.save_existing_data_df(fixed_values, temp = True)
+            self.save_existing_data_df(merged_data)
 
-            self.logger.info(f"Added {date} data and saved.")
+            self.logger.info(f"Added {dates_str} data and saved.")
 
             return True
 
         except Exception as e:
 
             self._handle_error(
-                e, message = f"Error occured when adding and saving historical weather data for {date}")
+                e, message = f"Error occured when adding and saving historical weather data for {dates_str}")
 
             return False
 
 
-    def _update_next_day(self):
-
-        # First check that the next day's data is available.
-        today = self._today()
-        yesterday = today - pd.Timedelta(1, 'day')
-
-        next_day_to_fetch = self.get_next_day_to_fetch(temp = True)
-        if next_day_to_fetch > yesterday:
-            self.logger.warning(
-                f"Can't update next day's data ({next_day_to_fetch}) as it is not available yet.")
-            return False
-
-        fetch_date_str = next_day_to_fetch.strftime('%Y-%m-%d')
+    def _get_dates_to_update(self, yesterday : datetime.date, max_days : int):
+        """Gets the dates following the existing data up to yesterday, at most max_days of them.
 
-        fetch_success = self._fetch_and_save_data_for_date(fetch_date_str)
-        if not fetch_success:
-            return False
+        Returns:
+            List of datetime.date objects, empty if the next day's data is not available yet.
+        """
 
-        merge_success = self._merge_new_and_existing_data(fetch_date_str)
+        next_day_to_fetch = self.get_next_day_to_fetch()
+        last_day_to_fetch = min(yesterday, next_day_to_fetch + (max_days - 1) * _ONE_DAY)
 
-        return merge_success
+        return [
+            next_day_to_fetch + day * _ONE_DAY
+            for day in range((last_day_to_fetch - next_day_to_fetch).days + 1)
+        ]
 
 
+    @_with_copy_on_write
     def update_to_yesterday(self):
         """Updates historical weather data to yesterday if possible.
 
-        We limit the number of attempts to ensure we can't be stuck in an
-        infinite loop. This means we limit the max number of days that can be
-        fetched as well.
+        All the days needed are fetched in one request per location and merged with the
+        existing data at once. We limit the number of days that can be fetched in one
+        update.
         """
 
-        max_attempts = 5
+        max_days = 5
 
-        attempt = 1
-
-        no_fails = True
+        yesterday = self._today() - _ONE_DAY
 
-        while attempt <= max_attempts and no_fails:
+        dates = self._get_dates_to_update(yesterday, max_days)
+        if not dates:
+            self.logger.warning(
+                f"Can't update next day's data ({self.get_next_day_to_fetch()}) as it is not "
+                "available yet.")
+            return
 
-            no_fails = self._update_next_day()
+        dates = [date.isoformat() for date in dates]
 
-            # Don't bombard the API.
-            if no_fails:
-                time.sleep(1)
+        fetch_success = self._fetch_and_save_data_for_dates(dates)
+        if not fetch_success:
+            return
 
-            attempt += 1
+        self._merge_new_and_existing_data(dates)
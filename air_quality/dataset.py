@@ -1,10 +1,19 @@
 """Module for the Dataset class.
 """
 
+from collections import namedtuple
 from enum import Enum
+from functools import cached_property
 import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from darts import TimeSeries
 from darts.dataprocessing.transformers import Scaler
-from darts.utils.timeseries_generation import datetime_attribute_timeseries
+from air_quality.time_features import get_time_features
+
+
+# Timeseries types to use for each dataset type.
+Slots = namedtuple('Slots', ['train', 'val', 'train_val'])
 
 
 class TrainingType(Enum):
@@ -17,9 +26,9 @@ class TrainingType(Enum):
     performance of the chosen model), or 'PROD' (production i.e., using the
     entire dataset to predict.)
 
-    The value of each mode is a dictionary. The keys of the dictionary represent
-    the parameters required by the model and the values of the dictionary represent
-    the components of the dataset.
+    The value of each mode is a Slots namedtuple. The field names of the namedtuple
+    represent the parameters required by the model and the values of the namedtuple
+    represent the components of the dataset.
 
     So for example when in VAL mode we use the train component to train on, the
     val component to validate and the train_val component for covariates or historical
@@ -31,9 +40,9 @@ class TrainingType(Enum):
     training, test set for validation, and the entire dataset for historical forecasts
     and covariates.
     """
-    VAL = {'train' : 'train', 'val' : 'val', 'train_val' : 'train_val'}
-    TEST = {'train' : 'train_val', 'val' : 'test', 'train_val' : 'train_val_test'}
-    PROD = {'train' : 'train_val_test', 'val' : 'none', 'train_val' : 'entire'}
+    VAL = Slots(train = 'train', val = 'val', train_val = 'train_val')
+    TEST = Slots(train = 'train_val', val = 'test', train_val = 'train_val_test')
+    PROD = Slots(train = 'train_val_test', val = 'none', train_val = 'entire')
 
 
 class Dataset:
@@ -42,12 +51,14 @@ class Dataset:
     Slices and prepares the data according to the dictionary of dataset choices. In this class
     we use the following terminology:
         dataset type: to refer to the use of a particular timeseries - either 'train', 'val' or
-            'train_val'. Corresponds to the keys of the dictionaries of the TrainingType Enum.
+            'train_val'. Corresponds to the field names of the Slots of the TrainingType Enum.
         timeseries type: to refer to a slice of data, e.g., 'train', 'val', 'train_val',
-            'test', 'train_val_test', etc. Corresponds to the the values of the dictionaries of
-            the TrainingType Enum.
+            'test', 'train_val_test', etc. Corresponds to the values of the Slots of the
+            TrainingType Enum.
 
     Attributes:
+        POLLUTANT_LOCATIONS: Dictionary with strings of pollutants as keys and their locations
+            as values, for pollutants whose location is not Montpellier.
         training_type: TrainingType for this dataset.
         target_ts_set: air_quality.TimeSeriesSet instance of the target series.
         covariates_ts_set: Dictionary with two keys 'past' and 'future' with the value in each
@@ -70,6 +81,8 @@ class Dataset:
                 of hour, day of week, and month. This is useful for evaluating which types of
                 covariates improve prediction.
             forecast_pollutants: List of strings of pollutants to be forecasted.
+            covariates_types: Tuple of the covariates types from dataset_choices.
+            feature_covariates: Frozenset of the feature covariates from dataset_choices.
             forecast_locations: List of strings of locations ordered to correspond with the list
                 of pollutants in forecast_pollutants.
             ts_target_unscaled: A dictionary with keys of dataset type and values containing lists
@@ -89,8 +102,15 @@ class Dataset:
             ts_covariates_scaled: Equivalent to ts_covariates_unscaled except that the timeseries
                 have been scaled.
             start_time: Pandas timestamp of the start time of all the series.
+
+        All of the attributes from target_scalers onwards are calculated on first access. The
+        covariates are checked to start at the same time as the target series when they are
+        first built.
     """
 
+    # Locations of pollutants not measured in Montpellier.
+    POLLUTANT_LOCATIONS = {'SO2' : 'Marseille'}
+
     def __init__(
         self,
         target_ts_set,
@@ -110,51 +130,74 @@ class Dataset:
 
         # Set the forecast location according to which pollutant is being analysed
         self.forecast_pollutants = dataset_choices['forecast_pollutants']
+        self.covariates_types = tuple(dataset_choices['covariates_types'])
+        self.feature_covariates = frozenset(dataset_choices['feature_covariates'])
         self.forecast_locations = [
-            'Marseille' if pollutant == 'SO2' \
-                else 'Montpellier' for pollutant in self.forecast_pollutants
+            self.POLLUTANT_LOCATIONS.get(pollutant, 'Montpellier')
+            for pollutant in self.forecast_pollutants
         ]
 
+        # Time features series and target end times by timeseries type, found on first use.
+        self._time_features_cache = {}
+        self._end_time_cache = {}
+
         self.ts_target_unscaled = self._get_unscaled_target_series()
-        self.target_scalers = self._get_target_scalers()
-        self.ts_target_scaled = self._get_scaled_target_series()
 
-        self.covariates_scalers = {
-            'past' : [],
-            'future' : []
-        }
-        self.ts_covariates_unscaled = self._get_unscaled_covariates_series()
-        self.ts_covariates_scaled = self._get_scaled_covariates_series()
 
-        # Set start times.
-        self.start_time = self._get_start_time()
+    # The scalers and the series derived from the target series are only calculated
+    # when first used.
+    @cached_property
+    def target_scalers(self):
+        return self._get_target_scalers()
+
+
+    @cached_property
+    def ts_target_scaled(self):
+        return self._get_scaled_target_series()
+
+
+    @cached_property
+    def ts_covariates_unscaled(self):
+        ts_covariates_unscaled = self._get_unscaled_covariates_series()
+
+        # Check the start times as soon as the covariates are built, so that covariates
+        # which don't start with the target series never reach a model.
+        self._get_start_time(ts_covariates_unscaled)
+
+        return ts_covariates_unscaled
+
 
+    @cached_property
+    def covariates_scalers(self):
+        return self._get_covariates_scalers()
 
-    def _get_start_time(self):
+
+    @cached_property
+    def ts_covariates_scaled(self):
+        return self._get_scaled_covariates_series()
+
+
+    @cached_property
+    def start_time(self):
+        return self._get_start_time(self.ts_covariates_unscaled)
+
+
+    def _get_start_time(self, ts_covariates_unscaled):
 
         start_time = self.ts_target_unscaled['train'][0].start_time()
 
-        start_time_error_msg = 'Start times are not the same.'
-        if (
-            'past' in self.ts_covariates_unscaled and
-            self.ts_covariates_unscaled['past']
-        ):
-            if self.ts_covariates_unscaled['past'][0].start_time() != start_time:
-                raise ValueError(start_time_error_msg)
-
-        if (
-            'future' in self.ts_covariates_unscaled and
-            self.ts_covariates_unscaled['future']
-        ):
-            if self.ts_covariates_unscaled['future'][0].start_time() != start_time:
-                raise ValueError(start_time_error_msg)
+        # Check any covariates we have start at the same time.
+        for cov_type in ('past', 'future'):
+            ts_sequence = ts_covariates_unscaled.get(cov_type)
+            if ts_sequence and ts_sequence[0].start_time() != start_time:
+                raise ValueError('Start times are not the same.')
 
         return start_time
 
 
     def _get_unscaled_target_series(self):
         series = {}
-        for ds_type, ds_slice in self.training_type.value.items():
+        for ds_type, ds_slice in self.training_type.value._asdict().items():
 
             # If type is not being provided, then set to None.
             if ds_slice == 'none':
@@ -166,21 +209,51 @@ class Dataset:
         return series
 
 
-    def _get_target_scalers(self):
+    @staticmethod
+    def _starmap_in_threads(function, args_sequence):
+        """Calls a function with each tuple of arguments, in a thread pool if there is more
+        than one call.
 
-        scalers = []
+        Scaler fits and transforms spend their time in numpy, which releases the GIL, so
+        threads run them in parallel.
 
-        # We always fit our scaler to the training data only.
-        for ts in self.ts_target_unscaled['train']:
-            s = Scaler()
-            s.fit(ts)
-            scalers.append(s)
+        Args:
+            function: Function to call.
+            args_sequence: Iterable of tuples of arguments.
+
+        Returns:
+            List of the results, in the order of the arguments.
+        """
+
+        args_sequence = list(args_sequence)
+
+        if len(args_sequence) > 1:
+            return Parallel(n_jobs = -1, prefer = 'threads')(
+                delayed(function)(*args) for args in args_sequence)
 
-        return scalers
+        return [function(*args) for args in args_sequence]
+
+
+    @staticmethod
+    def _fit_scaler(ts):
+        return Scaler().fit(ts)
+
+
+    def _get_target_scalers(self):
+
+        # We always fit our scaler to the training data only.
+        return self._starmap_in_threads(
+            self._fit_scaler, ((ts,) for ts in self.ts_target_unscaled['train']))
 
 
     def _get_scaled_target_series(self):
 
+        # The other dataset types are all contained in 'train_val', so we only transform
+        # each pollutant's 'train_val' timeseries with its scaler and take the others as
+        # slices of it. The slices share the scaled data rather than each holding a copy.
+        ts_train_val_scaled = self._starmap_in_threads(
+            Scaler.transform, zip(self.target_scalers, self.ts_target_unscaled['train_val']))
+
         ts_target_scaled = {}
         for ds_component, ts_sequence_unscaled in self.ts_target_unscaled.items():
 
@@ -190,48 +263,51 @@ class Dataset:
                 ts_target_scaled[ds_component] = None
                 continue
 
-            ts_sequence_scaled = []
-            scaler_index = 0
-            for ts in ts_sequence_unscaled:
-
-                # Get the scaler corresponding to this pollutant.
-                s = self.target_scalers[scaler_index]
-
-                # Transform the timeseries and add to the sequence.
-                ts_sequence_scaled.append(
-                    s.transform(ts)
-                )
-
-                scaler_index += 1
-
-            ts_target_scaled[ds_component] = ts_sequence_scaled
+            ts_target_scaled[ds_component] = [
+                ts_scaled.slice(ts.start_time(), ts.end_time())
+                for ts_scaled, ts in zip(ts_train_val_scaled, ts_sequence_unscaled)
+            ]
 
         return ts_target_scaled
 
 
     def _get_unscaled_time_features_series(self):
-        ts_type = self.training_type.value['train_val']
+        ts_type = self.training_type.value.train_val
         return self._get_unscaled_time_features_series_by_ts_type(ts_type)
 
 
     def _get_unscaled_time_features_series_by_ts_type(self, ts_type):
 
-        target_ts_sequence = self.target_ts_set.get_ts_sequence(ts_type)
+        # The time features are the same for every location, so build them once per
+        # timeseries type.
+        if ts_type not in self._time_features_cache:
 
-        time_index = target_ts_sequence[0].time_index
-        ts_time_features = datetime_attribute_timeseries(
-            time_index, attribute="hour", one_hot=False)
-        ts_time_features = ts_time_features.stack(
-            datetime_attribute_timeseries(time_index, attribute="day_of_week", one_hot=False))
-        ts_time_features = ts_time_features.stack(
-            datetime_attribute_timeseries(time_index, attribute="month", one_hot=False))
-        ts_time_features = [ts_time_features.astype(np.float32)] * len(self.forecast_locations)
-        return ts_time_features
+            # Take the time index straight from any of the target series.
+            time_index = next(iter(self.target_ts_set.ts[ts_type].values())).time_index
+
+            # Build all the features as one array rather than stacking a series per feature.
+            self._time_features_cache[ts_type] = TimeSeries.from_times_and_values(
+                time_index,
+                get_time_features(time_index),
+                columns = ['hour', 'day_of_week', 'month']
+            )
+
+        return [self._time_features_cache[ts_type]] * len(self.forecast_locations)
+
+
+    def _get_end_time(self, ts_type):
+
+        # All the target series of a timeseries type end at the same time, so use the first.
+        if ts_type not in self._end_time_cache:
+            self._end_time_cache[ts_type] = \
+                next(iter(self.target_ts_set.ts[ts_type].values())).end_time()
+
+        return self._end_time_cache[ts_type]
 
 
     def _get_unscaled_data_covariates_series(self):
 
-        ts_type = self.training_type.value['train_val']
+        ts_type = self.training_type.value.train_val
         return self._get_unscaled_data_covariates_series_by_ts_type(ts_type)
 
 
@@ -241,38 +317,44 @@ class Dataset:
 
         # Fix the end time to be no longer than the end of the equivalent target series.
         # Otherwise our time features series won't match the length of the covariates.
-        # TODO Don't rely on NO2 key.
-        end_time = self.target_ts_set.ts[ts_type]['NO2'].end_time()
+        end_time = self._get_end_time(ts_type)
 
-        for cov_type in self.dataset_choices['covariates_types']:
+        # Past and future covariates may come from the same set, in which case we only
+        # get the sequence once.
+        ts_sequences = {}
+
+        for cov_type in self.covariates_types:
 
             cov_ts_set = self.covariates_ts_set[cov_type]
 
-            covariates_ts_unscaled[cov_type] = cov_ts_set.get_ts_sequence(
-                ts_type, subset = self.forecast_locations, end_time = end_time
-            )
+            if id(cov_ts_set) not in ts_sequences:
+                ts_sequences[id(cov_ts_set)] = cov_ts_set.get_ts_sequence(
+                    ts_type, subset = self.forecast_locations, end_time = end_time
+                )
+
+            covariates_ts_unscaled[cov_type] = ts_sequences[id(cov_ts_set)]
 
         return covariates_ts_unscaled
 
 
     def _get_selected_covariates_series(self, data_covariates_series, time_features_series):
 
-        feature_covariates = self.dataset_choices['feature_covariates']
-        covariates_types = self.dataset_choices['covariates_types']
+        feature_covariates = self.feature_covariates
+        covariates_types = self.covariates_types
 
         ts_covariates = {
                 'past' : None,
                 'future' : None
             }
 
-        if feature_covariates == ['data']:
+        if feature_covariates == {'data'}:
             ts_covariates = data_covariates_series
 
-        elif feature_covariates == ['time']:
+        elif feature_covariates == {'time'}:
             for cov_type in covariates_types:
                 ts_covariates[cov_type] = time_features_series
 
-        elif 'time' in feature_covariates and 'data' in feature_covariates:
+        elif {'time', 'data'} <= feature_covariates:
 
             for cov_type in covariates_types:
                 ts_covariates[cov_type] = self.concatenate_ts_sequences(
@@ -291,56 +373,76 @@ class Dataset:
         )
 
 
-    def _get_scaled_covariates_series(self):
+    def _get_covariates_scalers(self):
 
-        # We must fit the scalers using only the training set.
-        # Get the unscaled covariates for the training set.
-        unscaled_data_covariates_series_train = \
-            self._get_unscaled_data_covariates_series_by_ts_type('train')
-        unscaled_time_features_series_train = \
-            self._get_unscaled_time_features_series_by_ts_type('train')
+        # We must fit the scalers using only the training set. The unscaled covariates
+        # already cover the training set, so we slice them to where it ends rather than
+        # building the training covariates again.
+        train_end_time = self._get_end_time('train')
 
-        unscaled_ts_covariates_train = self._get_selected_covariates_series(
-            unscaled_data_covariates_series_train,
-            unscaled_time_features_series_train
-        )
+        # The same timeseries can appear more than once - the time features are shared by
+        # every location and by past and future covariates - so we only fit a scaler once
+        # for each.
+        unique_ts = {
+            id(ts_train_val) : ts_train_val
+            for cov_type in self.covariates_types
+            for ts_train_val in self.ts_covariates_unscaled[cov_type]
+        }
 
-        covariates_types = self.dataset_choices['covariates_types']
+        fitted_scalers = dict(zip(
+            unique_ts.keys(),
+            self._starmap_in_threads(
+                self._fit_scaler,
+                (
+                    (ts_train_val.slice(ts_train_val.start_time(), train_end_time),)
+                    for ts_train_val in unique_ts.values()
+                )
+            )
+        ))
 
-        ts_covariates_scaled = {
-            'past' : None,
-            'future' : None
+        covariates_scalers = {
+            'past' : [],
+            'future' : []
         }
 
-
         # For the selected 'past' and/or 'future' covariates...
-        for cov_type in covariates_types:
-
-            # Get the unscaled timeseries sequence for the training set - this
-            # is what we use to fit the scaler.
-            unscaled_ts_sequence_train = unscaled_ts_covariates_train[cov_type]
+        for cov_type in self.covariates_types:
+            covariates_scalers[cov_type] = [
+                fitted_scalers[id(ts_train_val)]
+                for ts_train_val in self.ts_covariates_unscaled[cov_type]
+            ]
 
-            # Get the unscaled timeseries sequence for the training and validation set -
-            # this is what we want to transform with the scaler..
-            unscaled_ts_sequence_train_val = self.ts_covariates_unscaled[cov_type]
+        return covariates_scalers
 
-            scaled_ts_sequence = []
-            ts_sequence_index = 0
 
-            for ts_train in unscaled_ts_sequence_train:
+    def _get_scaled_covariates_series(self):
 
-                # Fit the scaler on the training set and store it.
-                s = Scaler()
-                s.fit(ts_train)
-                self.covariates_scalers[cov_type].append(s)
+        # Shared timeseries with a shared scaler only need transforming once.
+        unique_pairs = {
+            (id(s), id(ts_train_val)) : (s, ts_train_val)
+            for cov_type in self.covariates_types
+            for s, ts_train_val in zip(
+                self.covariates_scalers[cov_type], self.ts_covariates_unscaled[cov_type])
+        }
 
-                # Transform the combined training and validation set.
-                ts_train_val = unscaled_ts_sequence_train_val[ts_sequence_index]
-                scaled_ts_sequence.append(s.transform(ts_train_val))
+        transformed_series = dict(zip(
+            unique_pairs.keys(),
+            self._starmap_in_threads(Scaler.transform, unique_pairs.values())
+        ))
 
-                ts_sequence_index += 1
+        ts_covariates_scaled = {
+            'past' : None,
+            'future' : None
+        }
 
-            ts_covariates_scaled[cov_type] = scaled_ts_sequence
+        # For the selected 'past' and/or 'future' covariates, get the transformed
+        # combined training and validation set.
+        for cov_type in self.covariates_types:
+            ts_covariates_scaled[cov_type] = [
+                transformed_series[(id(s), id(ts_train_val))]
+                for s, ts_train_val in zip(
+                    self.covariates_scalers[cov_type], self.ts_covariates_unscaled[cov_type])
+            ]
 
         return ts_covariates_scaled
 
@@ -356,10 +458,17 @@ class Dataset:
             Pandas dataframe.
         """
 
+        # Only take the two rows we need rather than converting the whole timeseries.
+        first_last_df = pd.DataFrame(
+            ts.values(copy = False)[[0, -1]],
+            index = ts.time_index[[0, -1]],
+            columns = ts.components
+        )
+
         if caption:
-            return ts.pd_dataframe().iloc[[0, -1]].style.set_caption(caption)
+            return first_last_df.style.set_caption(caption)
         else:
-            return ts.pd_dataframe().iloc[[0, -1]]
+            return first_last_df
 
 
     def get_first_last_covariates(self, scaled = False):
@@ -378,24 +487,16 @@ class Dataset:
         else:
             ts_covariates = self.ts_covariates_unscaled
 
-        output_dfs = []
-
-        for covariate_type in self.dataset_choices['covariates_types']:
-
-            ts_sequence = ts_covariates[covariate_type]
-
-            # Convert to list if needed.
-            ts_sequence = self.maybe_convert_ts_sequence_to_list(ts_sequence)
-
-            for i in range(len(ts_sequence)):
-                output_dfs.append(
-                    self.get_ts_first_last(
-                        ts_sequence[i],
-                        caption = f"{covariate_type}: {self.forecast_pollutants[i]}"
-                    )
-                )
-
-        return output_dfs
+        # Convert each sequence to a list if needed.
+        return [
+            self.get_ts_first_last(
+                ts, caption = f"{covariate_type}: {self.forecast_pollutants[i]}"
+            )
+            for covariate_type in self.covariates_types
+            for i, ts in enumerate(
+                self.maybe_convert_ts_sequence_to_list(ts_covariates[covariate_type])
+            )
+        ]
 
 
     def get_first_last_target_series(self, scaled = False):
@@ -414,22 +515,14 @@ class Dataset:
         else:
             ts_target = self.ts_target_unscaled
 
-        output_dfs = []
-
-        for ds_component, ts_sequence in ts_target.items():
-
-            # Convert to list if needed.
-            ts_sequence = self.maybe_convert_ts_sequence_to_list(ts_sequence)
-
-            for i in range(len(ts_sequence)):
-                output_dfs.append(
-                    self.get_ts_first_last(
-                        ts_sequence[i],
-                        caption = f"{ds_component}: {self.forecast_pollutants[i]}"
-                    )
-                )
-
-        return output_dfs
+        # Convert each sequence to a list if needed.
+        return [
+            self.get_ts_first_last(
+                ts, caption = f"{ds_component}: {self.forecast_pollutants[i]}"
+            )
+            for ds_component, ts_sequence in ts_target.items()
+            for i, ts in enumerate(self.maybe_convert_ts_sequence_to_list(ts_sequence))
+        ]
 
 
     def concatenate_ts_sequences(self, ts_seq, other_ts_seq, axis = 0):
@@ -451,7 +544,42 @@ class Dataset:
                 f"Sequences of different length({len(ts_seq)} and {len(other_ts_seq)})"
             )
 
-        return [ts_seq[i].concatenate(other_ts_seq[i], axis = axis) for i in range(len(ts_seq))]
+        if axis == 1:
+            return [
+                self._concatenate_components(ts, other_ts)
+                for ts, other_ts in zip(ts_seq, other_ts_seq)
+            ]
+
+        return [ts.concatenate(other_ts, axis = axis) for ts, other_ts in zip(ts_seq, other_ts_seq)]
+
+
+    @staticmethod
+    def _concatenate_components(ts, other_ts):
+        """Concatenates the components of two Darts timeseries.
+
+        When the time indices match, the values are joined as one numpy array and wrapped in
+        a single new timeseries, rather than going through Darts' xarray concatenation.
+
+        Args:
+            ts: First Darts timeseries.
+            other_ts: Second Darts timeseries.
+
+        Returns:
+            Darts timeseries with the components of ts followed by those of other_ts.
+        """
+
+        if not ts.time_index.equals(other_ts.time_index):
+            return ts.concatenate(other_ts, axis = 1)
+
+        values = np.concatenate(
+            [ts.values(copy = False), other_ts.values(copy = False)], axis = 1
+        ).astype(np.float32, copy = False)
+
+        return TimeSeries.from_times_and_values(
+            ts.time_index,
+            values,
+            columns = list(ts.components) + list(other_ts.components)
+        )
 
 
     @staticmethod
@@ -466,11 +594,22 @@ class Dataset:
             List of Darts timeseries.
         """
 
+        # Callers only read the timeseries, so there is no need to copy it.
         if not isinstance(ts_sequence, list):
-            ts_sequence = [ts_sequence.copy()]
+            ts_sequence = [ts_sequence]
         return ts_sequence
 
 
+    @cached_property
+    def _additional_model_info(self):
+
+        # Extract the forecast pollutants from dataset_choices as they are
+        # specified separately.
+        additional_model_info = dict(self.dataset_choices)
+        additional_model_info.pop('forecast_pollutants', None)
+        return additional_model_info
+
+
     def get_model_input(self):
         """Restructures timeries and dataset data in to a form suitable for initializing a new
         instance of a model.
@@ -480,12 +619,6 @@ class Dataset:
             os a model instance.
         """
 
-        # Extract the forecast pollutants from dataset_choices as they are
-        # specified separately.
-        additional_model_info = {
-            k : v for k, v in self.dataset_choices.items() if k != 'forecast_pollutants'
-        }
-
         return {
             'target_series_unscaled' : self.ts_target_unscaled,
             'target_series' : self.ts_target_scaled,
@@ -494,5 +627,6 @@ class Dataset:
             'target_scalers' : self.target_scalers,
             'covariates_scalers' : self.covariates_scalers,
             'target_series_names' : self.dataset_choices['forecast_pollutants'],
-            'additional_model_info' : additional_model_info
+            # Models add to this dictionary, so each gets its own copy.
+            'additional_model_info' : dict(self._additional_model_info)
         }
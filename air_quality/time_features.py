@@ -0,0 +1,57 @@
+"""Module for building seasonal time features from time indices.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel = True, cache = True)
+def _fill_time_features(epoch_ns, time_features):
+    """Fills in the hour, day of week and month of each time.
+
+    Works on integers only. The month is found from the number of days since the epoch with
+    the civil from days algorithm.
+
+    Args:
+        epoch_ns: Numpy array of int64 nanoseconds since 1970-01-01.
+        time_features: Numpy array of shape (len(epoch_ns), 3) to fill.
+    """
+
+    for i in prange(epoch_ns.shape[0]):
+
+        seconds = epoch_ns[i] // 1_000_000_000
+        days = seconds // 86400
+
+        time_features[i, 0] = (seconds // 3600) % 24
+
+        # 1970-01-01 was a Thursday, and Monday is 0.
+        time_features[i, 1] = (days + 3) % 7
+
+        # Shift the epoch to 0000-03-01 so that leap days fall at the end of the year.
+        z = days + 719468
+        era = z // 146097
+        day_of_era = z - era * 146097
+        year_of_era = (
+            day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096
+        ) // 365
+        day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+        month_from_march = (5 * day_of_year + 2) // 153
+        time_features[i, 2] = month_from_march + 3 if month_from_march < 10 else month_from_march - 9
+
+
+def get_time_features(time_index):
+    """Gets the hour, day of week and month of each time in a time index.
+
+    The values are the same as the Pandas hour, day_of_week and month attributes.
+
+    Args:
+        time_index: Timezone naive Pandas DatetimeIndex.
+
+    Returns:
+        Numpy float32 array of shape (len(time_index), 3) with columns of hour, day of week
+        and month.
+    """
+
+    time_features = np.empty((len(time_index), 3), dtype = np.float32)
+    _fill_time_features(time_index.asi8, time_features)
+    return time_features
@@ -1,6 +1,7 @@
 """Module for the TimeSeriesSet class.
 """
 
+from collections import OrderedDict
 import numpy as np
 
 class TimeSeriesSet:
@@ -17,8 +18,13 @@ class TimeSeriesSet:
         'val', 'train_val', 'val_test', 'test', 'train_val_test', 'entire'.
 
     ts_names: A list of strings being the keys of the arg `timeseries_dict`.
+
+    The last TS_SEQUENCE_CACHE_SIZE sequences returned by get_ts_sequence are cached, keyed
+    by timeseries type, subset and end time.
     """
 
+    TS_SEQUENCE_CACHE_SIZE = 32
+
     def __init__(
         self,
         timeseries_dict,
@@ -28,6 +34,7 @@ class TimeSeriesSet:
 
         self.ts = {}
         self.ts_names = list(timeseries_dict.keys())
+        self._ts_sequence_cache = OrderedDict()
 
         ts_types = [
             'train',
@@ -74,19 +81,32 @@ class TimeSeriesSet:
             List of Darts timeseries.
         """
 
-        ts_names = subset if subset else self.ts_names
-        ts_sequence = []
-        for ts_name in ts_names:
-            if ts_type == 'none':
-                ts = None
-            else:
-                ts = self.ts[ts_type][ts_name]
-                if end_time is not None:
-                    if ts.is_within_range(end_time) and end_time != ts.end_time():
-                        ts, _ = ts.split_after(end_time)
-            ts_sequence.append(ts)
-
-        return ts_sequence
+        ts_names = tuple(subset) if subset else tuple(self.ts_names)
+
+        # Splitting a timeseries allocates a new one, so only do it once for each request.
+        cache_key = (ts_type, ts_names, end_time)
+        if cache_key in self._ts_sequence_cache:
+            self._ts_sequence_cache.move_to_end(cache_key)
+        else:
+            ts_sequence = []
+            for ts_name in ts_names:
+                if ts_type == 'none':
+                    ts = None
+                else:
+                    ts = self.ts[ts_type][ts_name]
+                    if end_time is not None:
+                        if ts.is_within_range(end_time) and end_time != ts.end_time():
+                            ts, _ = ts.split_after(end_time)
+                ts_sequence.append(ts)
+            self._ts_sequence_cache[cache_key] = ts_sequence
+
+            # Drop the least recently used sequence so the cache doesn't keep every split
+            # timeseries alive.
+            if len(self._ts_sequence_cache) > self.TS_SEQUENCE_CACHE_SIZE:
+                self._ts_sequence_cache.popitem(last = False)
+
+        # Return a new list so that callers can't change the cached one.
+        return list(self._ts_sequence_cache[cache_key])
 
 
     def start_time(self, ts_type : str):
@@ -76,4 +76,8 @@ def get_model_dataset(datasets, data_choices):
     )
 
 def get_ts_first_last(ts):
-    return ts.pd_dataframe().iloc[[0, -1]]
+    return pd.DataFrame(
+        ts.values(copy = False)[[0, -1]],
+        index = ts.time_index[[0, -1]],
+        columns = ts.components
+    )